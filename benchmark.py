@@ -0,0 +1,303 @@
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import main
+
+# Pipeline stages that can be benchmarked, in pipeline order
+STAGES = (
+    "generate_data", "calculate_correlation", "get_top_words",
+    "generate_ascii_chart", "generate_report", "save_data"
+)
+
+# Storage backend / generator combinations
+CONFIGS = {
+    "dict-scalar": {"backend": "dict", "generator": "scalar"},
+    "columnar-scalar": {"backend": "columnar", "generator": "scalar"},
+    "columnar-batch": {"backend": "columnar", "generator": "batch"}
+}
+
+# Parameter grids: symbols, days and total vocabulary size (half positive, half negative)
+GRIDS = {
+    "quick": {"symbols": [10, 100], "days": [31, 365], "vocab": [40]},
+    "default": {"symbols": [10, 100, 1000], "days": [31, 365], "vocab": [40, 1000]},
+    "full": {"symbols": [10, 100, 1000, 10000], "days": [31, 365, 3650], "vocab": [40, 1000, 10000]}
+}
+
+# Fields that identify a case when comparing two result files
+CASE_KEYS = ("stage", "config", "symbols", "days", "vocab")
+
+
+def build_analyzer(config, symbols, days, vocab, seed):
+    """Build an analyzer with a fixed seed, padding the word lists up to vocab words"""
+    random.seed(seed)
+    defaults = main.CryptoSentimentAnalysis(generator=None)
+    half = max(1, vocab // 2)
+    positive_words = (defaults.positive_words + [f"positive_term_{i}" for i in range(half)])[:half]
+    negative_words = (defaults.negative_words + [f"negative_term_{i}" for i in range(half)])[:vocab - half]
+    return main.CryptoSentimentAnalysis(
+        cryptocurrencies=main.synthetic_cryptocurrencies(symbols), days=days - 1, seed=seed,
+        positive_words=positive_words, negative_words=negative_words, **CONFIGS[config]
+    )
+
+
+def day_columns(analyzer, field):
+    """Per-symbol lists of one day field (the days each symbol has), in sentiment_data order"""
+    store = analyzer.store
+    if store is not None:
+        return [store.columns[field][row][store.present[row]].tolist() for row in range(len(store.symbols))]
+    return [data["data"].column(field).tolist() for data in analyzer.sentiment_data.values()]
+
+
+def stage_runner(stage, case, seed):
+    """Return (setup, run) callables for one stage; only run() is measured
+
+    Stages that take per-symbol value lists get them from setup(), so they
+    time the computation rather than reading the records.
+    """
+    state = {}
+
+    def setup():
+        state.clear()
+        if stage != "generate_data":
+            state["analyzer"] = build_analyzer(case["config"], case["symbols"], case["days"], case["vocab"], seed)
+        analyzer = state.get("analyzer")
+        if stage == "calculate_correlation":
+            state["inputs"] = list(zip(day_columns(analyzer, "positive_sentiment"),
+                                       day_columns(analyzer, "price_change_pct")))
+        elif stage == "generate_ascii_chart":
+            state["inputs"] = list(zip(analyzer.sentiment_data, day_columns(analyzer, "positive_sentiment")))
+
+    def run():
+        analyzer = state.get("analyzer")
+        if stage == "generate_data":
+            state["analyzer"] = build_analyzer(case["config"], case["symbols"], case["days"], case["vocab"], seed)
+        elif stage == "calculate_correlation":
+            for sentiment, price_change in state["inputs"]:
+                analyzer.calculate_correlation(sentiment, price_change)
+        elif stage == "get_top_words":
+            for data in analyzer.sentiment_data.values():
+                analyzer.get_top_words(data["data"], "positive_words")
+                analyzer.get_top_words(data["data"], "negative_words")
+        elif stage == "generate_ascii_chart":
+            for symbol, values in state["inputs"]:
+                analyzer.generate_ascii_chart(values, width=60, height=8, title=symbol)
+        elif stage == "generate_report":
+            analyzer.generate_report()
+        elif stage == "save_data":
+            with tempfile.TemporaryDirectory() as directory:
+                analyzer.save_data(os.path.join(directory, "data.json"))
+
+    return setup, run
+
+
+def max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_case(case, seed, repeat, trace_allocations):
+    """Measure one stage in the current process and return its result record
+
+    ru_maxrss only ever grows over the process lifetime, so the RSS figure
+    is how far run() raised it above the peak reached by then (setup
+    included): 0 when the stage fits in memory the setup already used.
+    """
+    setup, run = stage_runner(case["stage"], case, seed)
+
+    times = []
+    baseline_rss = rss_growth = None
+    for _ in range(repeat):
+        setup()
+        before = max_rss_kb()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+        if baseline_rss is None:
+            # Later repetitions start from the peak the first one left behind
+            baseline_rss, rss_growth = before, max_rss_kb() - before
+    wall = min(times)
+
+    result = dict(case)
+    result.update({
+        "wall_s": wall,
+        "wall_s_all": times,
+        "symbol_days_per_s": case["symbols"] * case["days"] / wall if wall > 0 else None,
+        "baseline_rss_kb": baseline_rss,
+        "rss_growth_kb": rss_growth
+    })
+
+    if trace_allocations:
+        # A separate traced pass, since tracemalloc slows the stage down
+        setup()
+        tracemalloc.start()
+        run()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["alloc_peak_bytes"] = peak
+        result["alloc_retained_bytes"] = current
+    return result
+
+
+def skip_reason(case, max_symbol_days, max_word_cells):
+    """Reason to skip a case that would not fit the configured limits, or None"""
+    symbol_days = case["symbols"] * case["days"]
+    if symbol_days > max_symbol_days:
+        return f"{symbol_days:,} symbol-days exceeds --max-symbol-days"
+    if symbol_days * case["vocab"] > max_word_cells:
+        return f"{symbol_days * case['vocab']:,} word cells exceeds --max-word-cells"
+    return None
+
+
+def run_grid(args):
+    """Run every case of the grid, each in a fresh subprocess so RSS growth is per case"""
+    grid = GRIDS[args.grid]
+    if args.symbols:
+        grid = dict(grid, symbols=args.symbols)
+    if args.days:
+        grid = dict(grid, days=args.days)
+    if args.vocab:
+        grid = dict(grid, vocab=args.vocab)
+
+    results = []
+    for stage, config, symbols, days, vocab in itertools.product(
+            args.stages, args.configs, grid["symbols"], grid["days"], grid["vocab"]):
+        case = {"stage": stage, "config": config, "symbols": symbols, "days": days, "vocab": vocab}
+        reason = skip_reason(case, args.max_symbol_days, args.max_word_cells)
+        if reason:
+            results.append(dict(case, skipped=reason))
+            print(f"skip  {format_case(case)}: {reason}", file=sys.stderr)
+            continue
+
+        command = [
+            sys.executable, os.path.abspath(__file__), "case", json.dumps(case),
+            "--seed", str(args.seed), "--repeat", str(args.repeat)
+        ]
+        if args.no_alloc:
+            command.append("--no-alloc")
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            results.append(dict(case, error=completed.stderr.strip().splitlines()[-1:]))
+            print(f"error {format_case(case)}: {completed.stderr.strip()}", file=sys.stderr)
+            continue
+        result = json.loads(completed.stdout)
+        results.append(result)
+        print(f"done  {format_case(case)}: {result['wall_s']:.4f}s, "
+              f"{result['symbol_days_per_s']:,.0f} symbol-days/s, +{result['rss_growth_kb'] / 1024:.0f} MB RSS",
+              file=sys.stderr)
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "grid": args.grid,
+            "seed": args.seed,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+
+
+def format_case(case):
+    return f"{case['stage']:<21} {case['config']:<16} {case['symbols']:>6} sym x {case['days']:>5} days, vocab {case['vocab']}"
+
+
+def compare(baseline, current, threshold):
+    """Return (lines, regression count) comparing wall time and memory growth of matching cases"""
+    def index(results):
+        return {tuple(r[key] for key in CASE_KEYS): r for r in results["results"] if "wall_s" in r}
+
+    base, cur = index(baseline), index(current)
+    lines = []
+    regressions = 0
+    for key in sorted(set(base) & set(cur), key=str):
+        old, new = base[key], cur[key]
+        flags = []
+        for metric in ("wall_s", "rss_growth_kb", "alloc_peak_bytes"):
+            if old.get(metric) and new.get(metric) is not None:
+                change = new[metric] / old[metric] - 1
+                if change > threshold:
+                    flags.append(f"{metric} +{change:.0%}")
+        time_change = new["wall_s"] / old["wall_s"] - 1 if old["wall_s"] else 0.0
+        status = "REGRESSION" if flags else "ok"
+        regressions += bool(flags)
+        lines.append(f"{status:<10} {format_case(new)}: {old['wall_s']:.4f}s -> {new['wall_s']:.4f}s "
+                     f"({time_change:+.0%}){'  [' + ', '.join(flags) + ']' if flags else ''}")
+    for key in sorted(set(base) - set(cur), key=str):
+        lines.append(f"{'missing':<10} {format_case(base[key])}")
+    return lines, regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CryptoSentimentAnalysis pipeline stages")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run a parameter grid and write a results file")
+    run_parser.add_argument("--grid", choices=sorted(GRIDS), default="quick")
+    run_parser.add_argument("--symbols", type=int, nargs="+", help="override the grid's symbol counts")
+    run_parser.add_argument("--days", type=int, nargs="+", help="override the grid's day counts")
+    run_parser.add_argument("--vocab", type=int, nargs="+", help="override the grid's vocabulary sizes")
+    run_parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    run_parser.add_argument("--configs", nargs="+", choices=sorted(CONFIGS), default=["dict-scalar"])
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--repeat", type=int, default=3, help="timed repetitions; the fastest is kept")
+    run_parser.add_argument("--no-alloc", action="store_true", help="skip the tracemalloc allocation pass")
+    run_parser.add_argument("--max-symbol-days", type=int, default=40_000_000)
+    run_parser.add_argument("--max-word-cells", type=int, default=500_000_000)
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--baseline", help="compare against this results file after running")
+    run_parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown flagged as regression")
+
+    compare_parser = subparsers.add_parser("compare", help="compare a results file against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+
+    case_parser = subparsers.add_parser("case", help=argparse.SUPPRESS)
+    case_parser.add_argument("case")
+    case_parser.add_argument("--seed", type=int, default=42)
+    case_parser.add_argument("--repeat", type=int, default=3)
+    case_parser.add_argument("--no-alloc", action="store_true")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "case":
+        print(json.dumps(run_case(json.loads(args.case), args.seed, args.repeat, not args.no_alloc)))
+        return 0
+
+    if args.command == "run":
+        results = run_grid(args)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+        if not args.baseline:
+            return 0
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        current, threshold = results, args.threshold
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        threshold = args.threshold
+
+    lines, regressions = compare(baseline, current, threshold)
+    print("\n".join(lines))
+    print(f"{regressions} regression(s) above {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
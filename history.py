@@ -0,0 +1,332 @@
+import datetime
+import json
+import math
+import os
+import urllib.parse
+from collections import Counter
+
+from sources import DataSource
+
+# Numeric day fields summarized per partition
+HISTORY_METRICS = ("positive_sentiment", "mentions", "posts", "likes", "price", "price_change_pct")
+
+# Word-count fields whose totals are kept per partition
+HISTORY_WORD_FIELDS = ("positive_words", "negative_words")
+
+INDEX_FILE = "index.json"
+
+# Bump when the layout of the per-partition statistics in index.json changes;
+# older indexes have their statistics rebuilt from the partition files on open
+INDEX_VERSION = 2
+
+
+def _date_str(value):
+    """Normalize a datetime/date or a string starting with YYYY-MM-DD to YYYY-MM-DD"""
+    if value is None:
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+def _empty_stats():
+    """Per-metric [count, sum, sum of squared deviations from the mean (M2), min, max]"""
+    return {metric: [0, 0.0, 0.0, None, None] for metric in HISTORY_METRICS}
+
+
+def _empty_words():
+    return {word_type: {} for word_type in HISTORY_WORD_FIELDS}
+
+
+def _summarize_day(stats, words, record):
+    """Add one day record to partition statistics (and word totals, unless words is None)"""
+    for metric in HISTORY_METRICS:
+        value = record.get(metric)
+        if value is None:
+            continue
+        metric_stats = stats[metric]
+        # Welford's update: M2 grows by the product of the deviations from the old and new means
+        old_mean = metric_stats[1] / metric_stats[0] if metric_stats[0] else 0.0
+        metric_stats[0] += 1
+        metric_stats[1] += value
+        metric_stats[2] += (value - old_mean) * (value - metric_stats[1] / metric_stats[0])
+        metric_stats[3] = value if metric_stats[3] is None else min(metric_stats[3], value)
+        metric_stats[4] = value if metric_stats[4] is None else max(metric_stats[4], value)
+    if words is not None:
+        for word_type in HISTORY_WORD_FIELDS:
+            totals = words[word_type]
+            for word, count in record.get(word_type, {}).items():
+                totals[word] = totals.get(word, 0) + count
+
+
+def _merge_stats(total, stats):
+    """Fold one partition's [count, sum, M2, min, max] into total (Chan et al.'s pairwise update)"""
+    if not stats[0]:
+        return
+    if total[0]:
+        delta = stats[1] / stats[0] - total[1] / total[0]
+        total[2] += stats[2] + delta * delta * total[0] * stats[0] / (total[0] + stats[0])
+    else:
+        total[2] = stats[2]
+    total[0] += stats[0]
+    total[1] += stats[1]
+    total[3] = stats[3] if total[3] is None else min(total[3], stats[3])
+    total[4] = stats[4] if total[4] is None else max(total[4], stats[4])
+
+
+class HistoryStore(DataSource):
+    """Append-only history on disk, partitioned into one file per symbol per month
+
+    Each partition is a JSON-lines file (SYMBOL/YYYY-MM.jsonl) of day
+    records. index.json holds per-symbol metadata and, per partition, its
+    min/max date, a bitmask of the days present and summary statistics
+    (count, sum, sum of squared deviations, min and max per metric, merged
+    across partitions with Chan's formula); word totals live beside the
+    partition in SYMBOL/YYYY-MM.words.json to keep the index small. Range
+    queries only open partitions that overlap the range, and partitions
+    entirely inside it are answered from their summaries alone.
+
+    append_many() writes the index and word totals once per call. append()
+    writes the day record straight away but keeps the index and word
+    totals in memory until flush(), so appending records one at a time
+    does not rewrite the index each time; use the store as a context
+    manager (or call flush()) to persist them. Queries on the same store
+    see unflushed appends.
+
+    Appending a day that is already stored supersedes it: reads keep the
+    last record per date and that partition's summary is recomputed. A
+    single writer per directory is assumed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.stats = Counter()
+        self._words = {}  # (symbol, month) -> word totals not yet written
+        self._dirty = False
+        try:
+            with open(os.path.join(directory, INDEX_FILE)) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = {"version": INDEX_VERSION, "symbols": {}, "partitions": {}}
+        self.symbols = index["symbols"]
+        self.partitions = index["partitions"]
+        if index.get("version", 1) < INDEX_VERSION:
+            for entry in self.partitions.values():
+                entry["stats"] = _empty_stats()
+                for record in self._read_partition(entry["symbol"], entry["month"]).values():
+                    _summarize_day(entry["stats"], None, record)
+            self._dirty = True
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def _partition_file(self, symbol, month, suffix=".jsonl"):
+        return os.path.join(self.directory, urllib.parse.quote(symbol, safe=""), f"{month}{suffix}")
+
+    def _read_words(self, symbol, month):
+        words = self._words.get((symbol, month))
+        if words is not None:
+            return words
+        self.stats["word_summaries_read"] += 1
+        try:
+            with open(self._partition_file(symbol, month, ".words.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return _empty_words()
+
+    def _write_words(self, symbol, month, words):
+        with open(self._partition_file(symbol, month, ".words.json"), "w") as f:
+            json.dump(words, f, separators=(",", ":"))
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        filename = os.path.join(self.directory, INDEX_FILE)
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({"version": INDEX_VERSION, "symbols": self.symbols, "partitions": self.partitions},
+                      f, separators=(",", ":"))
+        os.replace(temporary, filename)
+
+    def flush(self):
+        """Write the index and word totals changed by append() since the last flush"""
+        for (symbol, month), words in self._words.items():
+            self._write_words(symbol, month, words)
+        self._words.clear()
+        if self._dirty:
+            self._save_index()
+            self._dirty = False
+
+    def append(self, symbol, date, record, name=None, trend=None):
+        """Append one day record for a symbol; the index is written on flush()"""
+        return self._append([(symbol, date, record)], {symbol: {"name": name, "trend": trend}})
+
+    def append_many(self, observations, metadata=None):
+        """Append (symbol, date, record) tuples, opening each partition file once
+
+        metadata optionally maps symbols to {"name", "trend"}; None values
+        leave what is already stored. The index and word totals are written
+        before returning. Returns the number of records written.
+        """
+        written = self._append(observations, metadata)
+        self.flush()
+        return written
+
+    def _append(self, observations, metadata):
+        by_partition = {}
+        for symbol, date, record in observations:
+            date_str = _date_str(date)
+            by_partition.setdefault((symbol, date_str[:7]), []).append((date_str, record))
+
+        for symbol, meta in (metadata or {}).items():
+            stored = self.symbols.setdefault(symbol, {"name": symbol, "trend": "stable"})
+            stored.update({key: value for key, value in meta.items() if value is not None})
+
+        written = 0
+        for (symbol, month), days in by_partition.items():
+            self.symbols.setdefault(symbol, {"name": symbol, "trend": "stable"})
+            key = f"{symbol}/{month}"
+            entry = self.partitions.get(key)
+            if entry is None:
+                entry = self.partitions[key] = {
+                    "symbol": symbol, "month": month, "min_date": None, "max_date": None,
+                    "days": 0, "day_mask": 0, "stats": _empty_stats()
+                }
+                words = _empty_words()
+            else:
+                words = self._read_words(symbol, month)
+            self._dirty = True
+
+            filename = self._partition_file(symbol, month)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            replaced = False
+            with open(filename, "a") as f:
+                for date_str, record in days:
+                    line = dict(record)
+                    line["date"] = date_str
+                    f.write(json.dumps(line, separators=(",", ":"), default=dict) + "\n")
+
+                    bit = 1 << (int(date_str[8:10]) - 1)
+                    if entry["day_mask"] & bit:
+                        replaced = True
+                    else:
+                        entry["day_mask"] |= bit
+                        entry["days"] += 1
+                        _summarize_day(entry["stats"], words, record)
+                    entry["min_date"] = min(entry["min_date"] or date_str, date_str)
+                    entry["max_date"] = max(entry["max_date"] or date_str, date_str)
+                    written += 1
+
+            # A superseded day invalidates the running sums, so rebuild them from the file
+            if replaced:
+                entry["stats"], words = _empty_stats(), _empty_words()
+                for record in self._read_partition(symbol, month).values():
+                    _summarize_day(entry["stats"], words, record)
+            self._words[(symbol, month)] = words
+        if metadata:
+            self._dirty = True
+        self.stats["records_appended"] += written
+        return written
+
+    def _read_partition(self, symbol, month):
+        """{date_str: record} for one partition, the last record per date winning"""
+        self.stats["partitions_read"] += 1
+        days = {}
+        with open(self._partition_file(symbol, month)) as f:
+            for line in f:
+                record = json.loads(line)
+                days[record.pop("date")] = record
+        return days
+
+    def matching_partitions(self, symbols=None, start=None, end=None):
+        """Index entries of partitions overlapping the inclusive date range, by symbol and month"""
+        start, end = _date_str(start), _date_str(end)
+        if symbols is not None:
+            symbols = set(symbols)
+        matching = []
+        for entry in self.partitions.values():
+            if symbols is not None and entry["symbol"] not in symbols:
+                continue
+            if (start and entry["max_date"] < start) or (end and entry["min_date"] > end):
+                continue
+            matching.append(entry)
+        matching.sort(key=lambda entry: (entry["symbol"], entry["month"]))
+        return matching
+
+    def date_range(self, symbol=None):
+        """(first, last) stored date for a symbol (all symbols by default), or (None, None)"""
+        entries = self.matching_partitions(None if symbol is None else [symbol])
+        if not entries:
+            return None, None
+        return min(entry["min_date"] for entry in entries), max(entry["max_date"] for entry in entries)
+
+    def days(self, symbol, start=None, end=None):
+        """{date_str: record} for one symbol over the inclusive date range, in date order"""
+        start, end = _date_str(start), _date_str(end)
+        days = {}
+        for entry in self.matching_partitions([symbol], start, end):
+            for date_str, record in sorted(self._read_partition(symbol, entry["month"]).items()):
+                if (start is None or date_str >= start) and (end is None or date_str <= end):
+                    days[date_str] = record
+        return days
+
+    def _covered(self, entry, start, end):
+        return (start is None or entry["min_date"] >= start) and (end is None or entry["max_date"] <= end)
+
+    def _range_summaries(self, symbols, start, end, words=False):
+        """Yield (stats, word totals or None) per matching partition, from stored summaries when the range covers it"""
+        start, end = _date_str(start), _date_str(end)
+        for entry in self.matching_partitions(symbols, start, end):
+            if self._covered(entry, start, end):
+                self.stats["partitions_summarized"] += 1
+                yield entry["stats"], self._read_words(entry["symbol"], entry["month"]) if words else None
+                continue
+            stats, totals = _empty_stats(), _empty_words() if words else None
+            for date_str, record in self._read_partition(entry["symbol"], entry["month"]).items():
+                if (start is None or date_str >= start) and (end is None or date_str <= end):
+                    _summarize_day(stats, totals, record)
+            yield stats, totals
+
+    def aggregate(self, metric, symbols=None, start=None, end=None):
+        """count, sum, mean, min, max and std of a metric over symbols (all by default) and a date range
+
+        e.g. aggregate("mentions", ["ETH"], "2024-03-01", "2024-03-31")["sum"]
+        """
+        if metric not in HISTORY_METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(HISTORY_METRICS)}")
+        total = [0, 0.0, 0.0, None, None]
+        for stats, _ in self._range_summaries(symbols, start, end):
+            _merge_stats(total, stats[metric])
+
+        n, total_sum, m2, low, high = total
+        return {
+            "count": n,
+            "sum": total_sum,
+            "mean": total_sum / n if n else 0.0,
+            "min": low,
+            "max": high,
+            "std": math.sqrt(max(0.0, m2 / n)) if n else 0.0
+        }
+
+    def top_words(self, word_type="positive_words", symbols=None, start=None, end=None, k=5):
+        """Top k (word, count) pairs over symbols (all by default) and a date range"""
+        if word_type not in HISTORY_WORD_FIELDS:
+            raise ValueError(f"Unknown word type {word_type!r}, expected one of {', '.join(HISTORY_WORD_FIELDS)}")
+        totals = Counter()
+        for _, words in self._range_summaries(symbols, start, end, words=True):
+            totals.update(words[word_type])
+        return totals.most_common(k)
+
+    def fetch(self, symbols, start, end):
+        """DataSource interface, so CryptoSentimentAnalysis.load_source() can load any stored range"""
+        fetched = {}
+        for symbol in symbols:
+            if symbol not in self.symbols:
+                continue
+            days = self.days(symbol, start, end)
+            if days:
+                fetched[symbol] = dict(self.symbols[symbol], data=days)
+        return fetched
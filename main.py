@@ -1,26 +1,1808 @@
+import argparse
 import random
 import datetime
+import hashlib
 import math
 import json
 import os
 import textwrap
-from collections import defaultdict, Counter
+import bisect
+import sys
+import threading
+import time
+import warnings
+from array import array
+from contextlib import contextmanager
+from collections import defaultdict, deque, Counter
+from collections.abc import Mapping, MutableMapping
 
-class CryptoSentimentAnalysis:
-    def __init__(self):
-        # Define top 10 cryptocurrencies
-        self.cryptocurrencies = [
-            {"name": "Bitcoin", "symbol": "BTC", "current_price": 76408.41},
-            {"name": "Ethereum", "symbol": "ETH", "current_price": 3345.88},
-            {"name": "Tether", "symbol": "USDT", "current_price": 1.00},
-            {"name": "XRP", "symbol": "XRP", "current_price": 0.57},
-            {"name": "Binance Coin", "symbol": "BNB", "current_price": 541.40},
-            {"name": "Solana", "symbol": "SOL", "current_price": 184.32},
-            {"name": "USD Coin", "symbol": "USDC", "current_price": 1.00},
-            {"name": "Cardano", "symbol": "ADA", "current_price": 0.46},
-            {"name": "Dogecoin", "symbol": "DOGE", "current_price": 0.17},
-            {"name": "Avalanche", "symbol": "AVAX", "current_price": 34.29}
+# Top 10 cryptocurrencies used when no explicit universe is given
+TOP_CRYPTOCURRENCIES = [
+    {"name": "Bitcoin", "symbol": "BTC", "current_price": 76408.41},
+    {"name": "Ethereum", "symbol": "ETH", "current_price": 3345.88},
+    {"name": "Tether", "symbol": "USDT", "current_price": 1.00},
+    {"name": "XRP", "symbol": "XRP", "current_price": 0.57},
+    {"name": "Binance Coin", "symbol": "BNB", "current_price": 541.40},
+    {"name": "Solana", "symbol": "SOL", "current_price": 184.32},
+    {"name": "USD Coin", "symbol": "USDC", "current_price": 1.00},
+    {"name": "Cardano", "symbol": "ADA", "current_price": 0.46},
+    {"name": "Dogecoin", "symbol": "DOGE", "current_price": 0.17},
+    {"name": "Avalanche", "symbol": "AVAX", "current_price": 34.29}
+]
+
+# Storage backends for sentiment_data and data generators
+BACKENDS = ("dict", "columnar")
+GENERATORS = ("scalar", "batch", "parallel")
+
+# Sentiment trend patterns a cryptocurrency can follow over the period
+TREND_PATTERNS = ("uptrend", "downtrend", "volatile", "stable", "recovery", "correction")
+
+# Symbols drawn per block by the batch generator (bounds its temporary arrays)
+BATCH_BLOCK_SYMBOLS = 256
+
+# Trailing days kept in each per-symbol summary (the report charts these)
+SUMMARY_LAST_DAYS = 14
+
+# Environment toggles for the instrumentation surface (see Instrumentation.from_environment)
+METRICS_ENV = "CRYPTO_SENTIMENT_METRICS"
+METRICS_FILE_ENV = "CRYPTO_SENTIMENT_METRICS_FILE"
+PROFILE_ENV = "CRYPTO_SENTIMENT_PROFILE"
+TRACEMALLOC_ENV = "CRYPTO_SENTIMENT_TRACEMALLOC"
+
+# How generate_ascii_chart reduces series longer than the chart width
+DOWNSAMPLE_METHODS = ("mean", "min", "max", "lttb")
+
+# Symbols simulated between checkpoint writes (see GenerationCheckpoint)
+CHECKPOINT_EVERY = 100
+
+# Bump when the checkpoint record layout or the per-symbol streams change, so old checkpoints are rejected
+CHECKPOINT_VERSION = 2
+
+# Numeric day fields stored per symbol in a checkpoint (negative sentiment is 1 - positive);
+# word counts are stored as CSR runs of vocabulary ids (offsets, ids, counts) per word type
+CHECKPOINT_FIELDS = ("positive_sentiment", "mentions", "posts", "likes", "price", "price_change_pct")
+
+# Per-symbol aggregates kept in dict-backend checkpoint records, so resuming skips recomputing them
+CHECKPOINT_AGGREGATES = ("sentiment_price_correlation", "avg_daily_mentions", "top_positive_words", "top_negative_words")
+
+# Symbols charted in the report's trend section and listed in its terms section, when
+# present; otherwise the most mentioned symbols are used
+REPORT_TREND_SYMBOLS = ("BTC", "ETH", "SOL", "DOGE", "XRP")
+REPORT_TERM_SYMBOLS = ("BTC", "ETH", "SOL", "DOGE")
+
+# Report sections in rendering order (see CryptoSentimentAnalysis.iter_report)
+REPORT_SECTIONS = (
+    "header", "introduction", "overall", "trends", "correlation",
+    "engagement", "terms", "conclusion", "methodology"
+)
+
+# Binary snapshot layout: magic, little-endian uint64 header length, JSON
+# header, then each column aligned to SNAPSHOT_ALIGNMENT bytes
+SNAPSHOT_MAGIC = b"CSSNAP\x00\x01"
+SNAPSHOT_ALIGNMENT = 64
+
+
+def synthetic_cryptocurrencies(count):
+    """Return the top cryptocurrencies padded with placeholder symbols up to count"""
+    cryptos = [dict(crypto) for crypto in TOP_CRYPTOCURRENCIES[:count]]
+    for i in range(len(cryptos), count):
+        cryptos.append({
+            "name": f"Synthetic Coin {i}",
+            "symbol": f"SYN{i:05d}",
+            "current_price": round(0.01 + (i * 7919) % 100000 / 100, 2)
+        })
+    return cryptos
+
+
+def _json_default(obj):
+    """Serialize read-only mapping views (e.g. the columnar adapter) as plain dicts"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Vocabulary:
+    """Append-only word <-> integer id index shared by word-count matrices"""
+    
+    def __init__(self, words=()):
+        self.words = []
+        self.ids = {}
+        for word in words:
+            self.add(word)
+    
+    def add(self, word):
+        """Return the id of word, assigning the next free id if it is new"""
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = self.ids[word] = len(self.words)
+            self.words.append(word)
+        return word_id
+    
+    def __getitem__(self, word_id):
+        return self.words[word_id]
+    
+    def __contains__(self, word):
+        return word in self.ids
+    
+    def __iter__(self):
+        return iter(self.words)
+    
+    def __len__(self):
+        return len(self.words)
+
+
+# Trend names by code; DailySeries stores the code (unknown trends are appended)
+_TREND_NAMES = list(TREND_PATTERNS)
+_TREND_CODES = {trend: code for code, trend in enumerate(_TREND_NAMES)}
+
+
+def _trend_code(trend):
+    code = _TREND_CODES.get(trend)
+    if code is None:
+        code = _TREND_CODES[trend] = len(_TREND_NAMES)
+        _TREND_NAMES.append(sys.intern(trend))
+    return code
+
+
+class DailySeries(MutableMapping):
+    """Compact date -> day record mapping for one dict-backend symbol
+    
+    Days are kept sorted by date in typed arrays, one per numeric field,
+    with each day's word counts as (word id, count) runs in flat arrays
+    (CSR layout, ids from the analyzer's shared vocabularies). Date strings
+    are interned so every symbol shares them, and the trend is one code for
+    the whole series instead of a string per day.
+    
+    Deleting the oldest day (a sliding window's eviction) only advances a
+    head index; evicted rows are dropped in one compaction once they
+    outnumber the live ones, so eviction is O(1) amortized. Other inserts
+    and deletes shift the later rows.
+    
+    Reading a day returns a freshly built dict with the legacy keys, so
+    mutating it does not write back; assign a record to change a day.
+    Count fields are stored as integers, so assigned float counts are
+    truncated with int().
+    """
+    
+    FIELDS = (
+        ("positive_sentiment", "d"), ("negative_sentiment", "d"), ("mentions", "l"),
+        ("posts", "l"), ("likes", "l"), ("price", "d"), ("price_change_pct", "d")
+    )
+    WORD_FIELDS = ("positive_words", "negative_words")
+    
+    # Evicted rows kept before compacting is considered (small windows compact rarely)
+    COMPACT_MIN = 64
+    
+    __slots__ = ("_dates", "head", "columns", "word_offsets", "word_ids", "word_counts", "vocabularies", "trend_code")
+    
+    def __init__(self, vocabularies, trend="stable"):
+        self.vocabularies = vocabularies
+        self.trend_code = _trend_code(trend)
+        self._dates = []
+        self.head = 0
+        self.columns = {field: array(typecode) for field, typecode in self.FIELDS}
+        self.word_offsets = {word_type: array("l", [0]) for word_type in self.WORD_FIELDS}
+        self.word_ids = {word_type: array("l") for word_type in self.WORD_FIELDS}
+        self.word_counts = {word_type: array("l") for word_type in self.WORD_FIELDS}
+    
+    @classmethod
+    def from_arrays(cls, vocabularies, trend, dates, columns, word_offsets, word_ids, word_counts):
+        """Build a series in one go from sorted dates, per-field values and per-word-type CSR arrays"""
+        series = cls(vocabularies, trend)
+        series._dates = [sys.intern(date_str) for date_str in dates]
+        series.columns = {field: array(typecode, columns[field]) for field, typecode in cls.FIELDS}
+        series.word_offsets = {word_type: array("l", word_offsets[word_type]) for word_type in cls.WORD_FIELDS}
+        series.word_ids = {word_type: array("l", word_ids[word_type]) for word_type in cls.WORD_FIELDS}
+        series.word_counts = {word_type: array("l", word_counts[word_type]) for word_type in cls.WORD_FIELDS}
+        return series
+    
+    @property
+    def trend(self):
+        return _TREND_NAMES[self.trend_code]
+    
+    @trend.setter
+    def trend(self, trend):
+        self.trend_code = _trend_code(trend)
+    
+    @property
+    def dates(self):
+        """Sorted date strings of the stored days (read-only by convention)"""
+        return self._dates[self.head:] if self.head else self._dates
+    
+    def append(self, date_str, positive_sentiment, negative_sentiment, mentions, posts, likes,
+               price, price_change_pct, positive_words, negative_words):
+        """Add a day after the last one (the generators' fast path)"""
+        if len(self._dates) > self.head and date_str <= self._dates[-1]:
+            raise ValueError(f"{date_str} is not after {self._dates[-1]}; assign it instead")
+        self._dates.append(sys.intern(date_str))
+        columns = self.columns
+        columns["positive_sentiment"].append(positive_sentiment)
+        columns["negative_sentiment"].append(negative_sentiment)
+        columns["mentions"].append(mentions)
+        columns["posts"].append(posts)
+        columns["likes"].append(likes)
+        columns["price"].append(price)
+        columns["price_change_pct"].append(price_change_pct)
+        for word_type, counts in (("positive_words", positive_words), ("negative_words", negative_words)):
+            add = self.vocabularies[word_type].add
+            self.word_ids[word_type].extend([add(word) for word in counts])
+            self.word_counts[word_type].extend(counts.values())
+            self.word_offsets[word_type].append(len(self.word_ids[word_type]))
+    
+    def compact(self):
+        """Drop evicted rows from the arrays, so stored row i is day i again"""
+        head = self.head
+        if not head:
+            return
+        del self._dates[:head]
+        for field, _ in self.FIELDS:
+            del self.columns[field][:head]
+        for word_type in self.WORD_FIELDS:
+            offsets = self.word_offsets[word_type]
+            base = offsets[head]
+            del self.word_ids[word_type][:base]
+            del self.word_counts[word_type][:base]
+            self.word_offsets[word_type] = array("l", [offset - base for offset in offsets[head:]])
+        self.head = 0
+    
+    def _find(self, date_str):
+        """(stored row, found) for a date; stored rows count evicted ones too"""
+        row = bisect.bisect_left(self._dates, date_str, self.head)
+        return row, row < len(self._dates) and self._dates[row] == date_str
+    
+    def __getitem__(self, date_str):
+        row, found = self._find(date_str)
+        if not found:
+            raise KeyError(date_str)
+        return self._record(row)
+    
+    def _record(self, row):
+        record = {field: self.columns[field][row] for field, _ in self.FIELDS}
+        for word_type in self.WORD_FIELDS:
+            record[word_type] = self._words(row, word_type)
+        record["trend"] = self.trend
+        return record
+    
+    def words(self, row, word_type):
+        """{word: count} of one day (by row) for a word type"""
+        return self._words(self.head + row, word_type)
+    
+    def _words(self, row, word_type):
+        offsets, vocab = self.word_offsets[word_type], self.vocabularies[word_type].words
+        first, last = offsets[row], offsets[row + 1]
+        return dict(zip([vocab[word_id] for word_id in self.word_ids[word_type][first:last]],
+                        self.word_counts[word_type][first:last]))
+    
+    def __setitem__(self, date_str, record):
+        values = [int(record[field]) if typecode == "l" else record[field] for field, typecode in self.FIELDS]
+        words = [{word: int(count) for word, count in record[word_type].items()} for word_type in self.WORD_FIELDS]
+        row, found = self._find(date_str)
+        if not found and row == len(self._dates):
+            self.append(date_str, *values, *words)
+            return
+        if not found:
+            # Inserting before the last day shifts every later row
+            self.compact()
+            row, _ = self._find(date_str)
+            self._dates.insert(row, sys.intern(date_str))
+        for (field, _), value in zip(self.FIELDS, values):
+            if found:
+                self.columns[field][row] = value
+            else:
+                self.columns[field].insert(row, value)
+        for word_type, counts in zip(self.WORD_FIELDS, words):
+            add = self.vocabularies[word_type].add
+            offsets = self.word_offsets[word_type]
+            first = offsets[row]
+            last = offsets[row + 1] if found else first
+            self.word_ids[word_type][first:last] = array("l", [add(word) for word in counts])
+            self.word_counts[word_type][first:last] = array("l", counts.values())
+            if not found:
+                offsets.insert(row + 1, first)
+            self._shift_offsets(word_type, row + 1, len(counts) - (last - first))
+    
+    def __delitem__(self, date_str):
+        row, found = self._find(date_str)
+        if not found:
+            raise KeyError(date_str)
+        if row == self.head:
+            # Evicting the oldest day: O(1), compacting once evicted rows outnumber live ones
+            self.head += 1
+            if self.head >= self.COMPACT_MIN and self.head * 2 >= len(self._dates):
+                self.compact()
+            return
+        self.compact()
+        row, _ = self._find(date_str)
+        del self._dates[row]
+        for field, _ in self.FIELDS:
+            del self.columns[field][row]
+        for word_type in self.WORD_FIELDS:
+            offsets = self.word_offsets[word_type]
+            first, last = offsets[row], offsets[row + 1]
+            del self.word_ids[word_type][first:last]
+            del self.word_counts[word_type][first:last]
+            del offsets[row + 1]
+            self._shift_offsets(word_type, row + 1, first - last)
+    
+    def _shift_offsets(self, word_type, start, delta):
+        if delta:
+            offsets = self.word_offsets[word_type]
+            offsets[start:] = array("l", [offset + delta for offset in offsets[start:]])
+    
+    def __contains__(self, date_str):
+        return self._find(date_str)[1]
+    
+    def __iter__(self):
+        return iter(self.dates)
+    
+    def __len__(self):
+        return len(self._dates) - self.head
+    
+    def values(self):
+        return (self._record(row) for row in range(self.head, len(self._dates)))
+    
+    def items(self):
+        return ((self._dates[row], self._record(row)) for row in range(self.head, len(self._dates)))
+    
+    def column(self, field):
+        """The typed array of one numeric field, in date order (read-only by convention)"""
+        values = self.columns[field]
+        return values[self.head:] if self.head else values
+    
+    def csr(self, word_type):
+        """(offsets, word ids, counts) arrays of one word type, in date order
+        
+        Reading does not compact the series (readers may share it), so with
+        evicted rows pending these are rebased copies.
+        """
+        offsets, ids, counts = self.word_offsets[word_type], self.word_ids[word_type], self.word_counts[word_type]
+        if not self.head:
+            return offsets, ids, counts
+        base = offsets[self.head]
+        return array("l", [offset - base for offset in offsets[self.head:]]), ids[base:], counts[base:]
+    
+    def word_totals(self, word_type):
+        """Counter of word counts over all days, words in first-seen order"""
+        totals = Counter()
+        vocab = self.vocabularies[word_type].words
+        first = self.word_offsets[word_type][self.head]
+        for word_id, count in zip(self.word_ids[word_type][first:], self.word_counts[word_type][first:]):
+            totals[vocab[word_id]] += count
+        return totals
+    
+    def nbytes(self):
+        """Bytes held by the arrays and the date list (shared date strings and vocabularies excluded)"""
+        arrays = list(self.columns.values()) + list(self.word_offsets.values())
+        arrays += list(self.word_ids.values()) + list(self.word_counts.values())
+        return sys.getsizeof(self._dates) + sum(sys.getsizeof(values) for values in arrays)
+
+
+def top_k_indices(totals, k):
+    """Indices of the k largest values along the last axis, largest first
+    
+    Uses argpartition, so only the selected k entries are sorted; ties are
+    ordered by lower index (i.e. earlier vocabulary entry).
+    """
+    import numpy as np
+    
+    totals = np.asarray(totals)
+    n = totals.shape[-1]
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.zeros(totals.shape[:-1] + (0,), dtype="intp")
+    if k < n:
+        selected = np.argpartition(-totals, k - 1, axis=-1)[..., :k]
+    else:
+        selected = np.broadcast_to(np.arange(n), totals.shape).copy()
+    values = np.take_along_axis(totals, selected, axis=-1)
+    order = np.lexsort((selected, -values), axis=-1)
+    return np.take_along_axis(selected, order, axis=-1)
+
+
+def top_k_words(totals, vocab, k):
+    """Top k (word, count) pairs from a per-word-id totals vector, skipping zero counts"""
+    return [
+        (vocab[word_id], int(totals[word_id]))
+        for word_id in top_k_indices(totals, k).tolist()
+        if totals[word_id] > 0
+    ]
+
+
+def date_key(value):
+    """Normalize a date string, date or datetime to a YYYY-MM-DD key (None passes through)"""
+    if value is None or isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d")
+
+
+def to_datetime(value):
+    """Datetime for a datetime (returned as is) or anything whose str() starts with YYYY-MM-DD"""
+    if isinstance(value, datetime.datetime):
+        return value
+    return datetime.datetime.strptime(str(value)[:10], "%Y-%m-%d")
+
+
+def _day_record(record, trend):
+    """A full day record from an observation, defaulting optional fields and storing counts as integers"""
+    return {
+        "positive_sentiment": record["positive_sentiment"],
+        "negative_sentiment": record.get("negative_sentiment", 1 - record["positive_sentiment"]),
+        "mentions": int(record["mentions"]),
+        "posts": int(record.get("posts", 0)),
+        "likes": int(record.get("likes", 0)),
+        "price": record.get("price", 0.0),
+        "price_change_pct": record["price_change_pct"],
+        "positive_words": {word: int(count) for word, count in record.get("positive_words", {}).items()},
+        "negative_words": {word: int(count) for word, count in record.get("negative_words", {}).items()},
+        "trend": trend
+    }
+
+
+def date_slice(date_keys, start=None, end=None):
+    """Slice of sorted YYYY-MM-DD keys within the inclusive [start, end] range"""
+    start, end = date_key(start), date_key(end)
+    first = 0 if start is None else bisect.bisect_left(date_keys, start)
+    last = len(date_keys) if end is None else bisect.bisect_right(date_keys, end)
+    return slice(first, max(first, last))
+
+
+class WordCountMatrix:
+    """Sparse days x vocabulary count matrix for one symbol in CSR layout
+    
+    Row i holds the counts for dates[i]; its word ids and counts are
+    ids[indptr[i]:indptr[i + 1]] and counts[indptr[i]:indptr[i + 1]].
+    """
+    
+    def __init__(self, dates, vocab, indptr, ids, counts):
+        self.dates = dates
+        self.vocab = vocab
+        self.indptr = indptr
+        self.ids = ids
+        self.counts = counts
+    
+    @classmethod
+    def from_days(cls, days, vocab):
+        """Build from (date_str, {word: count}) pairs, adding unseen words to vocab"""
+        import numpy as np
+        
+        days = sorted(days, key=lambda day: day[0])
+        indptr = [0]
+        ids = []
+        counts = []
+        for _, word_counts in days:
+            for word, count in word_counts.items():
+                ids.append(vocab.add(word))
+                counts.append(count)
+            indptr.append(len(ids))
+        return cls(
+            [date_str for date_str, _ in days], vocab,
+            np.asarray(indptr, dtype="int64"), np.asarray(ids, dtype="int32"), np.asarray(counts, dtype="int64")
+        )
+    
+    @classmethod
+    def from_series(cls, series, word_type):
+        """Build from a DailySeries' own CSR arrays, without materializing its days"""
+        import numpy as np
+        
+        indptr, ids, counts = series.csr(word_type)
+        return cls(
+            list(series.dates), series.vocabularies[word_type],
+            np.array(indptr, dtype="int64"), np.array(ids, dtype="int32"), np.array(counts, dtype="int64")
+        )
+    
+    def totals(self, start=None, end=None):
+        """Per-word-id totals over the inclusive date range"""
+        import numpy as np
+        
+        days = date_slice(self.dates, start, end)
+        first, last = self.indptr[days.start], self.indptr[days.stop]
+        return np.bincount(
+            self.ids[first:last], weights=self.counts[first:last], minlength=len(self.vocab)
+        ).astype("int64")
+    
+    def top_k(self, k=5, start=None, end=None):
+        """Top k (word, count) pairs over the inclusive date range"""
+        return top_k_words(self.totals(start, end), self.vocab, k)
+
+
+class ColumnarSentimentStore:
+    """Per-metric NumPy arrays indexed by (symbol, date) over a shared date axis"""
+    
+    # Numeric day fields and their array dtypes; negative_sentiment is derived
+    NUMERIC_FIELDS = (
+        ("positive_sentiment", "float64"),
+        ("mentions", "int32"),
+        ("posts", "int32"),
+        ("likes", "int32"),
+        ("price", "float64"),
+        ("price_change_pct", "float64")
+    )
+    WORD_FIELDS = ("positive_words", "negative_words")
+    
+    def __init__(self, cryptocurrencies, dates, positive_words, negative_words):
+        import numpy as np
+        
+        self.symbols = [crypto["symbol"] for crypto in cryptocurrencies]
+        self.names = [crypto["name"] for crypto in cryptocurrencies]
+        self.start_prices = [crypto.get("current_price", 0.0) for crypto in cryptocurrencies]
+        self.symbol_index = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.date_keys = [date if isinstance(date, str) else date.strftime("%Y-%m-%d") for date in dates]
+        self.date_index = {date_str: col for col, date_str in enumerate(self.date_keys)}
+        self.trends = [None] * len(self.symbols)
+        
+        shape = (len(self.symbols), len(self.date_keys))
+        self.columns = {field: np.zeros(shape, dtype=dtype) for field, dtype in self.NUMERIC_FIELDS}
+        
+        # Which days each symbol has an observation for; simulated stores have every day,
+        # stores packed from dict data (see from_sentiment_data) may have gaps
+        self.present = np.ones(shape, dtype=bool)
+        
+        # Word counts are dense (symbol, date, word id) matrices over a fixed vocabulary
+        self.vocab = {"positive_words": Vocabulary(positive_words), "negative_words": Vocabulary(negative_words)}
+        self.word_counts = {
+            word_type: np.zeros(shape + (len(words),), dtype="int32")
+            for word_type, words in self.vocab.items()
+        }
+        
+        # Per-symbol aggregates, filled in by finalize()
+        self.correlations = None
+        self.avg_daily_mentions = None
+        self.top_words = None
+        
+        # Open memory map when the columns come from load_snapshot(), and the
+        # origin recorded in its header (None for simulated data)
+        self._mmap = None
+        self.origin = None
+    
+    @classmethod
+    def from_sentiment_data(cls, sentiment_data, positive_words, negative_words, start_prices=None):
+        """Pack a dict-backend sentiment_data into a store, keeping its aggregates
+        
+        Days missing for a symbol are left out of its presence mask (and
+        zero in the columns). Words outside the given vocabularies are
+        appended to them.
+        start_prices maps symbols to their starting (current_price) price;
+        for other symbols it is backed out of the first day's price change.
+        """
+        import numpy as np
+        
+        dates = sorted({date_str for data in sentiment_data.values() for date_str in data["data"]})
+        vocab = {"positive_words": Vocabulary(positive_words), "negative_words": Vocabulary(negative_words)}
+        for data in sentiment_data.values():
+            for day_data in data["data"].values():
+                for word_type, words in vocab.items():
+                    for word in day_data[word_type]:
+                        words.add(word)
+        
+        cryptocurrencies = []
+        for symbol, data in sentiment_data.items():
+            price = (start_prices or {}).get(symbol)
+            if price is None:
+                # The first day's price already includes that day's change
+                first_day = next(iter(data["data"].values()), {})
+                price = first_day.get("price", 0.0) / (1 + first_day.get("price_change_pct", 0.0) / 100)
+            cryptocurrencies.append({"name": data["name"], "symbol": symbol, "current_price": price})
+        store = cls(cryptocurrencies, dates, vocab["positive_words"], vocab["negative_words"])
+        store.present[:] = False
+        
+        for row, data in enumerate(sentiment_data.values()):
+            store.trends[row] = data["trend"]
+            for date_str, day_data in data["data"].items():
+                store.set_day(
+                    row, store.date_index[date_str], day_data["positive_sentiment"], day_data["mentions"],
+                    day_data["posts"], day_data["likes"], day_data["price"], day_data["price_change_pct"],
+                    day_data["positive_words"], day_data["negative_words"]
+                )
+        
+        store.correlations = [data["sentiment_price_correlation"] for data in sentiment_data.values()]
+        store.avg_daily_mentions = [data["avg_daily_mentions"] for data in sentiment_data.values()]
+        store.top_words = {
+            "positive_words": [list(data["top_positive_words"]) for data in sentiment_data.values()],
+            "negative_words": [list(data["top_negative_words"]) for data in sentiment_data.values()]
+        }
+        return store
+    
+    def save_snapshot(self, filename, origin=None):
+        """Write the store as a binary snapshot that load_snapshot() can memory-map
+        
+        origin describes where non-simulated data came from (kept as store.origin on loading).
+        """
+        import numpy as np
+        
+        arrays = [("columns", field, self.columns[field]) for field, _ in self.NUMERIC_FIELDS]
+        arrays += [("word_counts", word_type, self.word_counts[word_type]) for word_type in self.WORD_FIELDS]
+        
+        # Per-symbol aggregates are binary too, so opening never decodes them per symbol
+        arrays += [
+            ("aggregates", "start_prices", np.asarray(self.start_prices, dtype="float64")),
+            ("aggregates", "correlations", np.asarray(self.correlations, dtype="float64")),
+            ("aggregates", "avg_daily_mentions", np.asarray(self.avg_daily_mentions, dtype="float64"))
+        ]
+        for word_type in self.WORD_FIELDS:
+            rows = self.top_words[word_type]
+            word_ids = self.vocab[word_type].ids
+            top_n = max((len(words) for words in rows), default=0)
+            ids = np.full((len(rows), top_n), -1, dtype="int32")
+            counts = np.zeros((len(rows), top_n), dtype="int64")
+            for row, words in enumerate(rows):
+                for rank, (word, count) in enumerate(words):
+                    ids[row, rank] = word_ids[word]
+                    counts[row, rank] = count
+            arrays += [("top_word_ids", word_type, ids), ("top_word_counts", word_type, counts)]
+        
+        header = {
+            "version": 2,
+            "symbols": self.symbols,
+            "names": self.names,
+            "trends": self.trends,
+            "dates": self.date_keys,
+            "present": self.present_runs(),
+            "origin": origin,
+            "vocab": {word_type: vocab.words for word_type, vocab in self.vocab.items()},
+            "arrays": []
+        }
+        
+        # Offsets depend on the header size, so lay out the data after a first pass
+        def align(offset):
+            return -(-offset // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+        
+        def layout(data_start):
+            offset = data_start
+            entries = []
+            for section, name, values in arrays:
+                offset = align(offset)
+                entries.append({
+                    "section": section, "name": name, "offset": offset,
+                    "dtype": np.dtype(values.dtype).newbyteorder("<").str, "shape": list(values.shape)
+                })
+                offset += values.nbytes
+            return entries
+        
+        data_start = 0
+        while True:
+            header["arrays"] = layout(data_start)
+            encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+            needed = align(len(SNAPSHOT_MAGIC) + 8 + len(encoded))
+            if needed <= data_start:
+                break
+            data_start = needed
+        
+        with open(filename, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(len(encoded).to_bytes(8, "little"))
+            f.write(encoded)
+            for entry, (_, _, values) in zip(header["arrays"], arrays):
+                f.write(b"\0" * (entry["offset"] - f.tell()))
+                f.write(np.ascontiguousarray(values, dtype=entry["dtype"]).data)
+        return filename
+    
+    @classmethod
+    def load_snapshot(cls, filename):
+        """Open a binary snapshot; columns are read-only views into a memory map of the file
+        
+        Only the header is parsed up front, so opening costs the same for any
+        history size and later reads touch just the pages they need.
+        """
+        import mmap
+        import numpy as np
+        
+        with open(filename, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"{filename} is not a sentiment snapshot")
+            header_length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_length))
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        store = cls.__new__(cls)
+        store.symbols = header["symbols"]
+        store.names = header["names"]
+        store.symbol_index = {symbol: row for row, symbol in enumerate(store.symbols)}
+        store.date_keys = header["dates"]
+        store.date_index = {date_str: col for col, date_str in enumerate(store.date_keys)}
+        store.trends = header["trends"]
+        store.origin = header.get("origin")
+        store.vocab = {word_type: Vocabulary(words) for word_type, words in header["vocab"].items()}
+        
+        sections = {"columns": {}, "word_counts": {}, "aggregates": {}, "top_word_ids": {}, "top_word_counts": {}}
+        for entry in header["arrays"]:
+            shape = tuple(entry["shape"])
+            sections[entry["section"]][entry["name"]] = np.frombuffer(
+                mapped, dtype=entry["dtype"], count=math.prod(shape), offset=entry["offset"]
+            ).reshape(shape)
+        store.columns = sections["columns"]
+        store.word_counts = sections["word_counts"]
+        if "present" in header:
+            store.present = np.zeros((len(store.symbols), len(store.date_keys)), dtype=bool)
+            for row, runs in enumerate(header["present"]):
+                for first, last in runs:
+                    store.present[row, first:last] = True
+        else:
+            # Version 1 snapshots marked missing days with NaN sentiment
+            store.present = ~np.isnan(store.columns["positive_sentiment"])
+        store.start_prices = sections["aggregates"]["start_prices"]
+        store.correlations = sections["aggregates"]["correlations"]
+        store.avg_daily_mentions = sections["aggregates"]["avg_daily_mentions"]
+        store.top_words = {
+            word_type: _TopWordsColumn(
+                sections["top_word_ids"][word_type], sections["top_word_counts"][word_type], store.vocab[word_type]
+            )
+            for word_type in cls.WORD_FIELDS
+        }
+        store._mmap = mapped
+        return store
+    
+    def close(self):
+        """Release the memory map of a loaded snapshot"""
+        if self._mmap is not None:
+            self.columns = {}
+            self.word_counts = {}
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # Views are still referenced elsewhere; the map closes when they go away
+            self._mmap = None
+    
+    def present_runs(self):
+        """Per symbol, the [first, last) column ranges of the days it has an observation for"""
+        import numpy as np
+        
+        if self.present.all():
+            return [[[0, len(self.date_keys)]] if self.date_keys else [] for _ in self.symbols]
+        edges = np.diff(self.present.astype("int8"), axis=1, prepend=0, append=0)
+        return [np.flatnonzero(row).reshape(-1, 2).tolist() for row in edges]
+    
+    def present_columns(self, row):
+        """Columns of the days a symbol has an observation for, in date order"""
+        present = self.present[row]
+        if present.all():
+            return range(len(self.date_keys))
+        return present.nonzero()[0].tolist()
+    
+    def set_day(self, row, col, positive_sentiment, mentions, posts, likes,
+                price, price_change_pct, positive_words, negative_words):
+        """Store one symbol-day of data"""
+        self.present[row, col] = True
+        columns = self.columns
+        columns["positive_sentiment"][row, col] = positive_sentiment
+        columns["mentions"][row, col] = mentions
+        columns["posts"][row, col] = posts
+        columns["likes"][row, col] = likes
+        columns["price"][row, col] = price
+        columns["price_change_pct"][row, col] = price_change_pct
+        for word_type, counts in (("positive_words", positive_words), ("negative_words", negative_words)):
+            ids = self.vocab[word_type].ids
+            self.word_counts[word_type][row, col, [ids[word] for word in counts]] = list(counts.values())
+    
+    def finalize(self, top_n=5):
+        """Compute the per-symbol aggregates for every symbol at once"""
+        import numpy as np
+        
+        present = None if self.present.all() else self.present
+        self.correlations = pearson_rows(
+            self.columns["positive_sentiment"], self.columns["price_change_pct"], present
+        ).tolist()
+        if present is None:
+            self.avg_daily_mentions = self.columns["mentions"].mean(axis=1).tolist()
+        else:
+            days = present.sum(axis=1)
+            totals = np.where(present, self.columns["mentions"], 0).sum(axis=1, dtype="int64")
+            self.avg_daily_mentions = np.where(days > 0, totals / np.maximum(days, 1), 0.0).tolist()
+        
+        self.top_words = {}
+        for word_type, counts in self.word_counts.items():
+            totals = counts.sum(axis=1, dtype="int64")
+            order = top_k_indices(totals, top_n)
+            vocab = self.vocab[word_type]
+            self.top_words[word_type] = [
+                [(vocab[j], int(totals[row, j])) for j in order[row] if totals[row, j] > 0]
+                for row in range(len(self.symbols))
+            ]
+    
+    def day_record(self, row, col):
+        """Build the legacy per-day dict for one symbol-day"""
+        positive_sentiment = float(self.columns["positive_sentiment"][row, col])
+        record = {
+            "positive_sentiment": positive_sentiment,
+            "negative_sentiment": 1 - positive_sentiment,
+            "mentions": int(self.columns["mentions"][row, col]),
+            "posts": int(self.columns["posts"][row, col]),
+            "likes": int(self.columns["likes"][row, col]),
+            "price": float(self.columns["price"][row, col]),
+            "price_change_pct": float(self.columns["price_change_pct"][row, col])
+        }
+        for word_type in self.WORD_FIELDS:
+            counts = self.word_counts[word_type][row, col].tolist()
+            record[word_type] = {
+                word: count for word, count in zip(self.vocab[word_type], counts) if count
+            }
+        record["trend"] = self.trends[row]
+        return record
+    
+    def nbytes(self):
+        """Total bytes held by the column arrays"""
+        return (sum(column.nbytes for column in self.columns.values()) + self.present.nbytes +
+                sum(counts.nbytes for counts in self.word_counts.values()))
+
+
+class _TopWordsColumn:
+    """Per-symbol top (word, count) lists decoded on access from snapshot id/count arrays"""
+    
+    def __init__(self, ids, counts, vocab):
+        self._ids = ids
+        self._counts = counts
+        self._vocab = vocab
+    
+    def __getitem__(self, row):
+        return [
+            (self._vocab[word_id], count)
+            for word_id, count in zip(self._ids[row].tolist(), self._counts[row].tolist())
+            if word_id >= 0
+        ]
+    
+    def __len__(self):
+        return len(self._ids)
+
+
+def pearson_rows(a, b, present=None):
+    """Row-wise Pearson correlation of two 2-D arrays, 0 where undefined (like calculate_correlation)
+    
+    With a boolean present mask, each row only uses its present columns.
+    """
+    import numpy as np
+    
+    if present is not None:
+        a, b = np.where(present, a, 0.0), np.where(present, b, 0.0)
+        n = present.sum(axis=1)
+    else:
+        n = a.shape[1]
+        if n == 0:
+            return np.zeros(a.shape[0])
+    sum_a = a.sum(axis=1)
+    sum_b = b.sum(axis=1)
+    numerator = n * (a * b).sum(axis=1) - sum_a * sum_b
+    denominator = np.sqrt((n * (a * a).sum(axis=1) - sum_a * sum_a) *
+                          (n * (b * b).sum(axis=1) - sum_b * sum_b))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = numerator / denominator
+    return np.where((denominator != 0) & np.isfinite(result), result, 0.0)
+
+
+class _ColumnarSeriesView(Mapping):
+    """Read-only date -> day dict view over one symbol's row of a ColumnarSentimentStore"""
+    
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+    
+    def __getitem__(self, date_str):
+        col = self._store.date_index[date_str]
+        if not self._store.present[self._row, col]:
+            raise KeyError(date_str)
+        return self._store.day_record(self._row, col)
+    
+    def __contains__(self, date_str):
+        col = self._store.date_index.get(date_str)
+        return col is not None and bool(self._store.present[self._row, col])
+    
+    def __iter__(self):
+        date_keys = self._store.date_keys
+        return (date_keys[col] for col in self._store.present_columns(self._row))
+    
+    def __len__(self):
+        return int(self._store.present[self._row].sum())
+    
+    def values(self):
+        return (self._store.day_record(self._row, col) for col in self._store.present_columns(self._row))
+    
+    def items(self):
+        date_keys = self._store.date_keys
+        return ((date_keys[col], self._store.day_record(self._row, col)) for col in self._store.present_columns(self._row))
+
+
+class _ColumnarSymbolView(Mapping):
+    """Read-only view of one symbol with the same keys as a dict-backend entry"""
+    
+    KEYS = ("name", "symbol", "data", "trend", "sentiment_price_correlation",
+            "avg_daily_mentions", "top_positive_words", "top_negative_words")
+    
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+    
+    def __getitem__(self, key):
+        store, row = self._store, self._row
+        if key == "name":
+            return store.names[row]
+        if key == "symbol":
+            return store.symbols[row]
+        if key == "data":
+            return _ColumnarSeriesView(store, row)
+        if key == "trend":
+            return store.trends[row]
+        if key == "sentiment_price_correlation":
+            return store.correlations[row]
+        if key == "avg_daily_mentions":
+            return store.avg_daily_mentions[row]
+        if key == "top_positive_words":
+            return store.top_words["positive_words"][row]
+        if key == "top_negative_words":
+            return store.top_words["negative_words"][row]
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return iter(self.KEYS)
+    
+    def __len__(self):
+        return len(self.KEYS)
+
+
+class ColumnarSentimentView(Mapping):
+    """Lazy, read-only adapter exposing a ColumnarSentimentStore as the legacy sentiment_data dict
+    
+    With symbols given, only those symbols (in that order) are exposed.
+    """
+    
+    def __init__(self, store, symbols=None):
+        self.store = store
+        self.symbols = store.symbols if symbols is None else list(symbols)
+        self._selected = None if symbols is None else set(self.symbols)
+    
+    def __getitem__(self, symbol):
+        if self._selected is not None and symbol not in self._selected:
+            raise KeyError(symbol)
+        return _ColumnarSymbolView(self.store, self.store.symbol_index[symbol])
+    
+    def __contains__(self, symbol):
+        return symbol in (self.store.symbol_index if self._selected is None else self._selected)
+    
+    def __iter__(self):
+        return iter(self.symbols)
+    
+    def __len__(self):
+        return len(self.symbols)
+
+
+class StreamingAggregates:
+    """Running per-symbol accumulators updated one day-observation at a time
+    
+    Keeps the Pearson sums used by calculate_correlation, the mentions total
+    and the word Counters, so adding, replacing or evicting a day costs time
+    proportional to that day's word counts only. With window_days set, days
+    older than the newest day minus the window are evicted as time advances.
+    
+    Only the day ordinals are kept; the values of a replaced or evicted day
+    are read back from series (the symbol's DailySeries), so the caller
+    updates series after add() and deletes the evicted days afterwards.
+    """
+    
+    def __init__(self, series, window_days=None):
+        self.series = series
+        self.window_days = window_days
+        self.days = {}  # day ordinal -> date_str
+        self.n = 0
+        self.sum_a = self.sum_b = self.sum_ab = self.sum_a2 = self.sum_b2 = 0.0
+        self.sum_mentions = 0
+        self.word_counts = {"positive_words": Counter(), "negative_words": Counter()}
+        self._oldest = None
+        self._newest = None
+    
+    def seed(self):
+        """Account for the days already in series, returning those outside the sliding window"""
+        series = self.series
+        for date_str in series:
+            self.days[datetime.datetime.strptime(date_str, "%Y-%m-%d").toordinal()] = date_str
+        if not self.days:
+            return []
+        a, b = series.column("positive_sentiment"), series.column("price_change_pct")
+        self.n = len(series)
+        self.sum_a, self.sum_b = sum(a), sum(b)
+        self.sum_ab = sum(x * y for x, y in zip(a, b))
+        self.sum_a2 = sum(x * x for x in a)
+        self.sum_b2 = sum(y * y for y in b)
+        self.sum_mentions = sum(series.column("mentions"))
+        for word_type, counter in self.word_counts.items():
+            counter.update({word: count for word, count in series.word_totals(word_type).items() if count > 0})
+        self._oldest, self._newest = min(self.days), max(self.days)
+        return self.evict()
+    
+    def _apply(self, record, sign):
+        a = record["positive_sentiment"]
+        b = record["price_change_pct"]
+        self.n += sign
+        self.sum_a += sign * a
+        self.sum_b += sign * b
+        self.sum_ab += sign * a * b
+        self.sum_a2 += sign * a * a
+        self.sum_b2 += sign * b * b
+        self.sum_mentions += sign * record["mentions"]
+        for word_type, counter in self.word_counts.items():
+            for word, count in record.get(word_type, {}).items():
+                counter[word] += sign * count
+                if counter[word] <= 0:
+                    del counter[word]
+    
+    def add(self, date, record):
+        """Add or replace the observation for one day, returning the evicted date strings
+        
+        Call before writing record into series. Returns None if the day is
+        already outside the sliding window.
+        """
+        ordinal = date.toordinal()
+        if self.window_days is not None and self._newest is not None and \
+                ordinal <= self._newest - self.window_days:
+            return None
+        
+        previous = self.days.get(ordinal)
+        if previous is not None:
+            self._apply(self.series[previous], -1)
+        self.days[ordinal] = date.strftime("%Y-%m-%d")
+        self._apply(record, 1)
+        
+        if self._oldest is None or ordinal < self._oldest:
+            self._oldest = ordinal
+        if self._newest is None or ordinal > self._newest:
+            self._newest = ordinal
+        return self.evict()
+    
+    def evict(self):
+        """Drop days that fell out of the sliding window (amortized O(1) per day advanced)"""
+        evicted = []
+        if self.window_days is None or self._newest is None:
+            return evicted
+        cutoff = self._newest - self.window_days
+        while self._oldest <= cutoff:
+            expired = self.days.pop(self._oldest, None)
+            if expired is not None:
+                self._apply(self.series[expired], -1)
+                evicted.append(expired)
+            self._oldest += 1
+        return evicted
+    
+    def correlation(self):
+        """Pearson correlation from the running sums, 0 where undefined"""
+        n = self.n
+        if n == 0:
+            return 0
+        numerator = n * self.sum_ab - self.sum_a * self.sum_b
+        variance = (n * self.sum_a2 - self.sum_a * self.sum_a) * (n * self.sum_b2 - self.sum_b * self.sum_b)
+        # Subtracting evicted days can leave tiny negative rounding residue
+        if variance <= 0:
+            return 0
+        return numerator / math.sqrt(variance)
+    
+    def avg_daily_mentions(self):
+        return self.sum_mentions / self.n if self.n else 0
+    
+    def top_words(self, word_type, n=5):
+        return self.word_counts[word_type].most_common(n)
+
+
+class _StreamedEntry(dict):
+    """sentiment_data entry of a streamed symbol whose top words are computed when first read
+    
+    Ranking a symbol's whole vocabulary on every ingest would cost
+    O(vocabulary) per observation, so ingestion drops the top-words keys
+    and the first lookup after it fills them in from the stream.
+    """
+    
+    TOP_WORDS = {"top_positive_words": "positive_words", "top_negative_words": "negative_words"}
+    
+    def __init__(self, entry, stream):
+        super().__init__(entry)
+        self.stream = stream
+    
+    def __missing__(self, key):
+        word_type = self.TOP_WORDS.get(key)
+        if word_type is None:
+            raise KeyError(key)
+        value = self[key] = self.stream.top_words(word_type)
+        return value
+    
+    def get(self, key, default=None):
+        return self[key] if key in self or key in self.TOP_WORDS else default
+
+
+class CorrelationEngine:
+    """Rolling, lagged and cross-symbol Pearson correlations over (symbol, day) matrices
+    
+    x and y are 2-D float arrays with one row per symbol and one column per
+    day; NaN marks a missing observation. Every method works on all symbols
+    at once from cumulative sums and returns NaN wherever a correlation is
+    undefined (too few paired observations or a constant series).
+    """
+    
+    def __init__(self, x, y, symbols=None, dates=None):
+        import numpy as np
+        
+        self.x = np.asarray(x, dtype="float64")
+        self.y = np.asarray(y, dtype="float64")
+        if self.x.shape != self.y.shape or self.x.ndim != 2:
+            raise ValueError(f"x and y must be 2-D arrays of the same shape, got {self.x.shape} and {self.y.shape}")
+        self.symbols = list(symbols) if symbols is not None else list(range(self.x.shape[0]))
+        self.dates = list(dates) if dates is not None else list(range(self.x.shape[1]))
+    
+    @staticmethod
+    def _centered(values, mask):
+        """Zero out missing entries and subtract each row's mean to limit cancellation in the sums"""
+        import numpy as np
+        
+        counts = mask.sum(axis=1, keepdims=True)
+        filled = np.where(mask, values, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, filled.sum(axis=1, keepdims=True) / counts, 0.0)
+        return np.where(mask, filled - means, 0.0)
+    
+    @staticmethod
+    def _pearson(n, sum_x, sum_y, sum_xy, sum_x2, sum_y2, min_periods):
+        """Pearson correlation from (possibly array-valued) sums, NaN where undefined"""
+        import numpy as np
+        
+        var_x = n * sum_x2 - sum_x * sum_x
+        var_y = n * sum_y2 - sum_y * sum_y
+        # Treat variances at rounding-noise level as constant series
+        defined = (n >= min_periods) & (var_x > 1e-12 * n * sum_x2) & (var_y > 1e-12 * n * sum_y2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = (n * sum_xy - sum_x * sum_y) / np.sqrt(var_x * var_y)
+        return np.where(defined, np.clip(result, -1.0, 1.0), np.nan)
+    
+    def _pair(self, x, y):
+        import numpy as np
+        
+        mask = ~(np.isnan(x) | np.isnan(y))
+        return mask, self._centered(x, mask), self._centered(y, mask)
+    
+    def rolling(self, window, min_periods=None):
+        """Correlation over the trailing `window` days ending at each day, shape (symbols, days)
+        
+        Columns before the first full window are NaN.
+        """
+        import numpy as np
+        
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        min_periods = window if min_periods is None else max(2, min_periods)
+        mask, x, y = self._pair(self.x, self.y)
+        
+        def window_sums(values):
+            cumulative = np.zeros((values.shape[0], values.shape[1] + 1))
+            np.cumsum(values, axis=1, out=cumulative[:, 1:])
+            return cumulative[:, window:] - cumulative[:, :-window]
+        
+        result = np.full(self.x.shape, np.nan)
+        if self.x.shape[1] >= window:
+            result[:, window - 1:] = self._pearson(
+                window_sums(mask.astype("float64")), window_sums(x), window_sums(y),
+                window_sums(x * y), window_sums(x * x), window_sums(y * y), min_periods
+            )
+        return result
+    
+    def lagged(self, lags=range(1, 6), min_periods=3):
+        """Full-period correlation of x[t] with y[t + lag] for each lag, shape (symbols, len(lags))
+        
+        Positive lags test whether x leads y; negative lags whether y leads x.
+        """
+        import numpy as np
+        
+        lags = list(lags)
+        n_days = self.x.shape[1]
+        result = np.full((self.x.shape[0], len(lags)), np.nan)
+        for column, lag in enumerate(lags):
+            if abs(lag) >= n_days:
+                continue
+            if lag >= 0:
+                x, y = self.x[:, :n_days - lag], self.y[:, lag:]
+            else:
+                x, y = self.x[:, -lag:], self.y[:, :n_days + lag]
+            mask, x, y = self._pair(x, y)
+            result[:, column] = self._pearson(
+                mask.sum(axis=1), x.sum(axis=1), y.sum(axis=1),
+                (x * y).sum(axis=1), (x * x).sum(axis=1), (y * y).sum(axis=1), min_periods
+            )
+        return result
+    
+    def matrix(self, values=None, min_periods=3):
+        """Symbol x symbol correlation matrix of x (or `values`) over pairwise-complete days"""
+        import numpy as np
+        
+        values = self.x if values is None else np.asarray(values, dtype="float64")
+        mask = ~np.isnan(values)
+        weights = mask.astype("float64")
+        centered = self._centered(values, mask)
+        
+        # For each pair (i, j) the sums only run over days both symbols observed
+        n = weights @ weights.T
+        sum_x = centered @ weights.T
+        sum_x2 = (centered * centered) @ weights.T
+        return self._pearson(n, sum_x, sum_x.T, centered @ centered.T, sum_x2, sum_x2.T, min_periods)
+
+
+def _trend_table(n_days):
+    """Sentiment modifier per trend pattern and day, rows indexed like TREND_PATTERNS"""
+    import numpy as np
+    
+    day = np.arange(n_days, dtype="float64")
+    table = np.zeros((len(TREND_PATTERNS), n_days))
+    table[TREND_PATTERNS.index("uptrend")] = np.minimum(0.15, 0.005 * day)
+    table[TREND_PATTERNS.index("downtrend")] = np.maximum(-0.15, -0.005 * day)
+    table[TREND_PATTERNS.index("volatile")] = 0.15 * np.sin(day / 5)
+    table[TREND_PATTERNS.index("recovery")] = 0.15 * (1 - np.exp(-day / 15))
+    table[TREND_PATTERNS.index("correction")] = -0.10 * (1 - np.exp(-day / 10))
+    return table
+
+
+def _simulate_block(cryptocurrencies, trend_table, vocab_sizes, rng):
+    """Draw every simulated field for a block of cryptocurrencies at once
+    
+    Mirrors the per-day draws of generate_data(), returning arrays of shape
+    (symbols, days), word counts of shape (symbols, days, words) and one
+    TREND_PATTERNS index per symbol.
+    """
+    import numpy as np
+    
+    symbols = [crypto["symbol"] for crypto in cryptocurrencies]
+    n = len(symbols)
+    n_days = trend_table.shape[1]
+    
+    # Base sentiment bias and mention multiplier per symbol
+    bias_low = np.array([0.6 if s in ["BTC", "ETH", "SOL"] else 0.45 if s in ["DOGE", "XRP"] else 0.4
+                         for s in symbols])
+    bias = rng.uniform(bias_low, bias_low + 0.2)
+    multiplier = np.array([3 if s in ["BTC", "ETH"] else 2 if s in ["SOL", "BNB", "XRP"] else 1
+                           for s in symbols])
+    trend_codes = rng.integers(0, len(TREND_PATTERNS), n)
+    trend_modifier = trend_table[trend_codes]
+    
+    daily_random = rng.uniform(-0.1, 0.1, (n, n_days))
+    positive = np.clip(bias[:, None] + trend_modifier + daily_random, 0.1, 0.9)
+    
+    base_mentions = rng.integers(5000, 50001, (n, n_days)) * multiplier[:, None]
+    mentions = (base_mentions * (1 + trend_modifier + daily_random)).astype("int64")
+    posts = (mentions * rng.uniform(0.2, 0.4, (n, n_days))).astype("int64")
+    likes = (posts * rng.uniform(3, 15, (n, n_days))).astype("int64")
+    
+    # Price random walk driven by sentiment, sometimes moving against it
+    price_change_pct = (positive - 0.5) * 2 * rng.uniform(0.5, 2.0, (n, n_days))
+    price_change_pct[rng.random((n, n_days)) < 0.2] *= -1
+    start_prices = np.array([crypto["current_price"] for crypto in cryptocurrencies])
+    prices = start_prices[:, None] * np.cumprod(1 + price_change_pct / 100, axis=1)
+    
+    simulated = {
+        "positive_sentiment": positive,
+        "mentions": mentions,
+        "posts": posts,
+        "likes": likes,
+        "price": prices,
+        "price_change_pct": price_change_pct,
+        "trend_codes": trend_codes
+    }
+    
+    # Word clouds: a word appears with probability p and then gets a
+    # count uniform in 1..1% of mentions. One uniform draw u serves both,
+    # since u / p is itself uniform on [0, 1) given u < p.
+    max_count = (mentions * 0.01).astype("int32")
+    for word_type, probability, n_words in (("positive_words", positive, vocab_sizes[0]),
+                                            ("negative_words", 1 - positive, vocab_sizes[1])):
+        u = rng.random((n, n_days, n_words), dtype="float32")
+        scale = (max_count / probability).astype("float32")[:, :, None]
+        counts = np.multiply(u, scale).astype("int32")
+        counts += 1
+        np.minimum(counts, max_count[:, :, None], out=counts)
+        counts *= u < probability.astype("float32")[:, :, None]
+        simulated[word_type] = counts
+    return simulated
+
+
+def _symbol_digest(seed, symbol):
+    """SHA-256 of the run seed and a symbol name, the root of that symbol's random streams"""
+    return hashlib.sha256(f"{int(seed)}:{symbol}".encode("utf-8")).digest()
+
+
+def symbol_seed_sequence(seed, symbol):
+    """Independent NumPy seed sequence for one symbol, derived from the run seed and the symbol name"""
+    import numpy as np
+    
+    digest = _symbol_digest(seed, symbol)
+    return np.random.SeedSequence(seed, spawn_key=tuple(int.from_bytes(digest[i:i + 4], "big") for i in range(0, 32, 4)))
+
+
+def symbol_random(seed, symbol):
+    """Independent random.Random stream for one symbol, derived from the run seed and the symbol name"""
+    return random.Random(int.from_bytes(_symbol_digest(seed, symbol), "big"))
+
+
+class GenerationCheckpoint:
+    """Append-only JSON-lines record of the symbols a generation run has finished
+    
+    The first line is a header describing the run (seed, dates, vocabulary
+    and backend); every further line holds one symbol's simulated days.
+    Records are buffered and written `every` symbols at a time, each batch
+    synced to disk. On load, records after a truncated line (an interrupted
+    write) are dropped, and a header that does not match the current run
+    raises ValueError rather than mixing data from different settings.
+    """
+    
+    def __init__(self, filename, header, every=CHECKPOINT_EVERY):
+        self.filename = filename
+        self.header = header
+        self.every = every
+        self.completed = {}
+        self._pending = []
+        self._header_written = False
+        self._load()
+    
+    def _load(self):
+        try:
+            f = open(self.filename, "rb")
+        except FileNotFoundError:
+            return
+        valid = 0
+        with f:
+            for n, line in enumerate(f):
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if n == 0:
+                    if record != self.header:
+                        raise ValueError(
+                            f"Checkpoint {self.filename} was written by a run with different settings "
+                            f"(seed, dates, vocabulary or backend); remove it to start over"
+                        )
+                    self._header_written = True
+                else:
+                    self.completed[record["symbol"]] = record
+                valid += len(line)
+        
+        # Cut off a partially written record so new ones start on a line of their own
+        with open(self.filename, "r+b") as f:
+            f.truncate(valid)
+    
+    def add(self, record):
+        self._pending.append(record)
+        if len(self._pending) >= self.every:
+            self.flush()
+    
+    def flush(self):
+        """Write and sync the buffered records"""
+        if not self._pending and self._header_written:
+            return
+        with open(self.filename, "a") as f:
+            if not self._header_written:
+                f.write(json.dumps(self.header, separators=(",", ":")) + "\n")
+                self._header_written = True
+            for record in self._pending:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending.clear()
+    
+    def remove(self):
+        """Delete the checkpoint once the run it records is complete"""
+        self._pending.clear()
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
+
+
+class LazySentimentData(MutableMapping):
+    """sentiment_data mapping whose entries are simulated on first access
+    
+    Iteration, len() and membership only look at the symbol list; reading
+    an entry calls loader(symbol) once and keeps the result. Assigning an
+    entry (e.g. from ingest) replaces it like a plain dict would.
+    """
+    
+    _PENDING = object()
+    
+    def __init__(self, symbols, loader):
+        self.loader = loader
+        self._entries = dict.fromkeys(symbols, self._PENDING)
+    
+    def __getitem__(self, symbol):
+        entry = self._entries[symbol]
+        if entry is self._PENDING:
+            entry = self._entries[symbol] = self.loader(symbol)
+        return entry
+    
+    def __setitem__(self, symbol, entry):
+        self._entries[symbol] = entry
+    
+    def __delitem__(self, symbol):
+        del self._entries[symbol]
+    
+    def __contains__(self, symbol):
+        return symbol in self._entries
+    
+    def __iter__(self):
+        return iter(self._entries)
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def is_loaded(self, symbol):
+        return self._entries[symbol] is not self._PENDING
+    
+    def loaded(self):
+        """Symbols materialized so far, in universe order"""
+        return [symbol for symbol, entry in self._entries.items() if entry is not self._PENDING]
+    
+    def prefetch(self, symbols=None):
+        """Materialize the given symbols (all by default); returns how many were newly simulated"""
+        symbols = list(self._entries) if symbols is None else symbols
+        pending = [symbol for symbol in symbols if self._entries[symbol] is self._PENDING]
+        for symbol in pending:
+            self[symbol]
+        return len(pending)
+
+
+def _generate_shard(args):
+    """Process-pool worker: simulate a contiguous range of symbols into shared memory"""
+    import numpy as np
+    from multiprocessing import shared_memory
+    
+    layout, start, cryptocurrencies, n_days, vocab_sizes, seed = args
+    segments = {field: shared_memory.SharedMemory(name=name) for field, (name, _, _) in layout.items()}
+    try:
+        arrays = {
+            field: np.ndarray(shape, dtype=dtype, buffer=segments[field].buf)
+            for field, (_, shape, dtype) in layout.items()
+        }
+        trend_table = _trend_table(n_days)
+        trend_codes = []
+        for offset, crypto in enumerate(cryptocurrencies):
+            rng = np.random.default_rng(symbol_seed_sequence(seed, crypto["symbol"]))
+            simulated = _simulate_block([crypto], trend_table, vocab_sizes, rng)
+            for field, values in arrays.items():
+                values[start + offset] = simulated[field][0]
+            trend_codes.append(int(simulated["trend_codes"][0]))
+        del arrays
+    finally:
+        for segment in segments.values():
+            segment.close()
+    return start, trend_codes
+
+
+def downsample(values, width, method="mean"):
+    """Map a series onto width chart columns, returning (source indices, column values)
+    
+    Short series are stretched so each value spans one or more columns. Long
+    series are split into width equal buckets reduced with "mean", "min" or
+    "max", or thinned with Largest-Triangle-Three-Buckets ("lttb"); the index
+    of a column is the first index of its bucket (or the point LTTB picked).
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}, expected one of {', '.join(DOWNSAMPLE_METHODS)}")
+    n = len(values)
+    if n <= width:
+        indices = [column * n // width for column in range(width)]
+        return indices, [values[i] for i in indices]
+    if method == "lttb":
+        indices = lttb_indices(values, width)
+        return indices, [values[i] for i in indices]
+    
+    bounds = [column * n // width for column in range(width + 1)]
+    if method == "mean":
+        columns = [sum(values[bounds[c]:bounds[c + 1]]) / (bounds[c + 1] - bounds[c]) for c in range(width)]
+    else:
+        reduce = min if method == "min" else max
+        columns = [reduce(values[bounds[c]:bounds[c + 1]]) for c in range(width)]
+    return bounds[:-1], columns
+
+
+def lttb_indices(values, threshold):
+    """Indices of the threshold points kept by Largest-Triangle-Three-Buckets"""
+    n = len(values)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][:threshold]
+    
+    selected = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for bucket in range(threshold - 2):
+        # The average of the next bucket is the third vertex of the triangle
+        next_start = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+        
+        ay = values[a]
+        best, best_area = -1, -1.0
+        for i in range(int(bucket * bucket_size) + 1, int((bucket + 1) * bucket_size) + 1):
+            area = abs((a - avg_x) * (values[i] - ay) - (a - i) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def _stage_names(value):
+    """Stage names from a comma-separated environment value"""
+    return [stage for stage in value.split(",") if stage]
+
+
+class Instrumentation:
+    """Per-stage timers and counters, with optional cProfile/tracemalloc capture of chosen stages
+    
+    Stages nest and their timings are inclusive. profile and trace_memory
+    name the stages to capture; the results are included in metrics().
+    """
+    
+    enabled = True
+    
+    def __init__(self, profile=(), trace_memory=(), profile_dir=None, top=15):
+        self.profile = set(profile)
+        self.trace_memory = set(trace_memory)
+        self.profile_dir = profile_dir
+        self.top = top
+        self.timers = {}
+        self.counters = Counter()
+        self.profiles = {}
+        self.memory = {}
+        self._created = time.perf_counter()
+        self._profiling = False
+    
+    @classmethod
+    def from_environment(cls, environ=None):
+        """Instrumentation enabled by CRYPTO_SENTIMENT_METRICS, or the shared no-op instance"""
+        environ = os.environ if environ is None else environ
+        if environ.get(METRICS_ENV, "").lower() in ("", "0", "false", "no", "off"):
+            return NULL_INSTRUMENTATION
+        return cls(profile=_stage_names(environ.get(PROFILE_ENV, "")),
+                   trace_memory=_stage_names(environ.get(TRACEMALLOC_ENV, "")))
+    
+    def add_time(self, name, seconds, calls=1):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0}
+        timer["calls"] += calls
+        timer["total_s"] += seconds
+        timer["max_s"] = max(timer["max_s"], seconds / calls if calls else seconds)
+    
+    def count(self, name, n=1):
+        self.counters[name] += n
+    
+    @contextmanager
+    def stage(self, name):
+        """Time a block, capturing a profile or allocation trace if requested for this stage"""
+        profiler = None
+        if name in self.profile and not self._profiling:
+            import cProfile
+            profiler = cProfile.Profile()
+            self._profiling = True
+        tracing = False
+        if name in self.trace_memory:
+            import tracemalloc
+            tracing = not tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            self.add_time(name, time.perf_counter() - start)
+            if profiler is not None:
+                self._profiling = False
+                self._record_profile(name, profiler)
+            if name in self.trace_memory:
+                self._record_memory(name, tracing)
+    
+    def timed_iter(self, name, iterable, counter=None):
+        """Yield from iterable, timing only the work done inside it and counting items"""
+        iterator = iter(iterable)
+        clock = time.perf_counter
+        elapsed = 0.0
+        items = 0
+        try:
+            while True:
+                start = clock()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += clock() - start
+                    break
+                elapsed += clock() - start
+                items += 1
+                yield item
+        finally:
+            self.add_time(name, elapsed)
+            if counter:
+                self.count(counter, items)
+    
+    def _record_profile(self, name, profiler):
+        import pstats
+        
+        if self.profile_dir:
+            profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+        stats = pstats.Stats(profiler)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top]
+        self.profiles[name] = [
+            {"function": f"{filename}:{line}({function})", "calls": calls, "tottime_s": tottime, "cumtime_s": cumtime}
+            for (filename, line, function), (_, calls, tottime, cumtime, _) in rows
         ]
+    
+    def _record_memory(self, name, started_here):
+        import tracemalloc
+        
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:self.top]
+        if started_here:
+            tracemalloc.stop()
+        self.memory[name] = {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top": [{"location": str(stat.traceback), "bytes": stat.size, "blocks": stat.count} for stat in top]
+        }
+    
+    def metrics(self):
+        """Structured snapshot of every timer, counter and capture"""
+        return {
+            "enabled": True,
+            "uptime_s": time.perf_counter() - self._created,
+            "stages": self.timers,
+            "counters": dict(self.counters),
+            "profiles": self.profiles,
+            "memory": self.memory
+        }
+    
+    def dump(self, filename):
+        """Write metrics() as JSON"""
+        with open(filename, "w") as f:
+            json.dump(self.metrics(), f, indent=2)
+        return f"Metrics saved to {filename}"
+
+
+class _NullInstrumentation:
+    """Disabled instrumentation: every hook is a cheap no-op"""
+    
+    enabled = False
+    
+    def __init__(self):
+        self._context = _NullContext()
+    
+    def add_time(self, name, seconds, calls=1):
+        pass
+    
+    def count(self, name, n=1):
+        pass
+    
+    def stage(self, name):
+        return self._context
+    
+    def timed_iter(self, name, iterable, counter=None):
+        return iterable
+    
+    def metrics(self):
+        return {"enabled": False}
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_INSTRUMENTATION = _NullInstrumentation()
+
+
+class ReadWriteLock:
+    """Shared read / exclusive write lock, e.g. for serving queries while ingesting
+    
+    Waiting writers block new readers, so a steady stream of reads cannot
+    starve them. Both sides are reentrant per thread, and the writer may
+    also read; a reader must not ask for the write side.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+    
+    @contextmanager
+    def read(self):
+        depth = getattr(self._local, "depth", 0)
+        nested = depth > 0 or self._writer == threading.get_ident()
+        if not nested:
+            with self._condition:
+                while self._writer is not None or self._writers_waiting:
+                    self._condition.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if not nested:
+                with self._condition:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._condition.notify_all()
+    
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer != me:
+                self._writers_waiting += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._condition.wait()
+                finally:
+                    self._writers_waiting -= 1
+                self._writer = me
+            self._writer_depth += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    self._condition.notify_all()
+
+
+class CryptoSentimentAnalysis:
+    def __init__(self, backend="dict", cryptocurrencies=None, days=30, generator="scalar", seed=None,
+                 window_days=None, workers=None, positive_words=None, negative_words=None,
+                 instrumentation=None, lazy=False, source=None, end_date=None, checkpoint=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        if generator is not None and generator not in GENERATORS:
+            raise ValueError(f"Unknown generator {generator!r}, expected one of {', '.join(GENERATORS)}")
+        if generator in ("batch", "parallel") and backend != "columnar":
+            raise ValueError(f"The {generator} generator requires the columnar backend")
+        if lazy and (backend != "dict" or generator != "scalar"):
+            raise ValueError("Lazy evaluation requires the dict backend and the scalar generator")
+        if checkpoint is not None and (generator != "scalar" or lazy):
+            raise ValueError("Checkpointing requires the scalar generator without lazy evaluation")
+        self.backend = backend
+        self.generator = generator
+        self.lazy = lazy
+        
+        # The scalar generator gives every symbol its own stream, so pick a seed if none was
+        # given; it comes from the global random module (random.seed() still pins a run)
+        # and is kept in self.seed so any run can be reproduced
+        if generator == "scalar" and seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        
+        # Timers and counters; off (a no-op) unless passed in or enabled by environment
+        if instrumentation is None:
+            instrumentation = Instrumentation.from_environment()
+        elif instrumentation is True:
+            instrumentation = Instrumentation()
+        elif instrumentation is False:
+            instrumentation = NULL_INSTRUMENTATION
+        self.instrumentation = instrumentation
+        
+        # Held shared by readers that may run alongside ingestion (query.QueryService),
+        # and exclusively by ingestion, loading and regeneration
+        self.data_lock = ReadWriteLock()
+        
+        # Streaming ingestion state: per-symbol accumulators, built on first ingest
+        self.window_days = window_days
+        self.streams = {}
+        
+        # Define the cryptocurrency universe (top 10 by default)
+        self.cryptocurrencies = [dict(crypto) for crypto in (cryptocurrencies or TOP_CRYPTOCURRENCIES)]
+        self._symbol_rows = {crypto["symbol"]: row for row, crypto in enumerate(self.cryptocurrencies)}
         
         # Common words for sentiment generation
         self.positive_words = [
@@ -37,127 +1819,483 @@ class CryptoSentimentAnalysis:
             "warning", "hack", "competition"
         ]
         
-        # Generate data for the past 30 days
-        self.end_date = datetime.datetime.now()
-        self.start_date = self.end_date - datetime.timedelta(days=30)
-        self.dates = [self.start_date + datetime.timedelta(days=i) for i in range(31)]
+        # Custom vocabularies (e.g. larger ones for benchmarks) replace the defaults
+        if positive_words is not None:
+            self.positive_words = list(positive_words)
+        if negative_words is not None:
+            self.negative_words = list(negative_words)
+        
+        # Generate data for the past `days` days (30 by default), up to today unless end_date is given
+        if end_date is None:
+            end_date = datetime.datetime.now()
+        self.end_date = to_datetime(end_date)
+        self.start_date = self.end_date - datetime.timedelta(days=days)
+        self.dates = [self.start_date + datetime.timedelta(days=i) for i in range(days + 1)]
+        
+        # Memoized per-symbol summaries and word-count matrices (see symbol_summary)
+        self._summaries = {}
+        self._word_matrices = {}
+        self._invalidation_listeners = []
+        self.vocabularies = {
+            "positive_words": Vocabulary(self.positive_words),
+            "negative_words": Vocabulary(self.negative_words)
+        }
+        
+        # Generate sentiment data (generator=None leaves it empty, e.g. for load_snapshot),
+        # or pull it from a data source instead of simulating it; data_origin describes
+        # where non-simulated data came from (see load_source) and is None for simulated data
+        self.data_origin = None
+        self.store = None
+        self.sentiment_data = {}
+        if source is not None:
+            self.load_source(source)
+        elif generator == "batch":
+            self.generate_data_batch(seed)
+        elif generator == "parallel":
+            self.generate_data_parallel(workers, seed)
+        elif generator == "scalar":
+            self.generate_data(checkpoint)
+    
+    def generate_data(self, checkpoint=None, checkpoint_every=CHECKPOINT_EVERY):
+        """Generate simulated sentiment data for each cryptocurrency
         
-        # Generate sentiment data
-        self.generate_data()
+        Every symbol draws from its own stream (see symbol_rng), so a symbol's
+        data depends only on the seed and the symbol, not on which other
+        symbols are generated or in what order. In lazy mode nothing is
+        simulated here; sentiment_data fills itself in on first access.
+        
+        With a checkpoint filename, finished symbols are written to it every
+        checkpoint_every symbols (see GenerationCheckpoint). Rerunning with
+        the same seed, dates and vocabulary after an interruption reloads
+        them instead of simulating them again, giving the same data as an
+        uninterrupted run. The file is removed once generation completes.
+        """
+        if checkpoint is not None and self.lazy:
+            raise ValueError("Checkpointing is not available in lazy mode")
+        with self.data_lock.write(), self.instrumentation.stage("generate_data"):
+            self._generate_data(checkpoint, checkpoint_every)
     
-    def generate_data(self):
-        """Generate simulated sentiment data for each cryptocurrency"""
+    def _generate_data(self, checkpoint=None, checkpoint_every=CHECKPOINT_EVERY):
         self.sentiment_data = {}
+        self.data_origin = None
+        self.invalidate_summaries()
+        
+        # Lazy mode only records which symbols exist; each is simulated on first access
+        if self.lazy:
+            self.store = None
+            self.sentiment_data = LazySentimentData(
+                [crypto["symbol"] for crypto in self.cryptocurrencies], self._materialize_symbol
+            )
+            return
+        
+        # The columnar backend writes straight into preallocated arrays
+        self.store = None
+        if self.backend == "columnar":
+            self.store = ColumnarSentimentStore(
+                self.cryptocurrencies, self.dates, self.positive_words, self.negative_words
+            )
+        
+        if checkpoint is not None:
+            with self.instrumentation.stage("checkpoint"):
+                checkpoint = GenerationCheckpoint(checkpoint, self._checkpoint_header(), checkpoint_every)
+        
+        try:
+            for row, crypto in enumerate(self.cryptocurrencies):
+                record = checkpoint.completed.get(crypto["symbol"]) if checkpoint is not None else None
+                if record is not None and record["name"] == crypto["name"] and record["current_price"] == crypto["current_price"]:
+                    entry = self._restore_symbol(row, crypto, record)
+                    self.instrumentation.count("symbols_resumed")
+                else:
+                    entry = self._simulate_symbol(row, crypto, self.symbol_rng(crypto["symbol"]))
+                    if checkpoint is not None:
+                        with self.instrumentation.stage("checkpoint"):
+                            checkpoint.add(self._checkpoint_record(row, crypto, entry))
+                if entry is not None:
+                    self.sentiment_data[crypto["symbol"]] = entry
+        except BaseException:
+            # Keep whatever finished before the interruption (including Ctrl-C)
+            if checkpoint is not None:
+                checkpoint.flush()
+            raise
+        
+        if checkpoint is not None:
+            checkpoint.remove()
         
-        for crypto in self.cryptocurrencies:
-            sentiment_by_date = {}
+        if self.store is not None:
+            with self.instrumentation.stage("finalize"):
+                self.store.finalize()
+            self.sentiment_data = ColumnarSentimentView(self.store)
+    
+    def symbol_rng(self, symbol):
+        """The random.Random stream a symbol is simulated from, derived from self.seed and the symbol"""
+        return symbol_random(self.seed, symbol)
+    
+    def _checkpoint_header(self):
+        return {
+            "version": CHECKPOINT_VERSION,
+            "seed": self.seed,
+            "backend": self.backend,
+            "start": self.dates[0].strftime("%Y-%m-%d") if self.dates else None,
+            "days": len(self.dates),
+            "vocabularies": {word_type: list(vocab.words) for word_type, vocab in self.vocabularies.items()}
+        }
+    
+    def _checkpoint_record(self, row, crypto, entry):
+        """One finished symbol's simulated days, as a checkpoint line"""
+        record = {"symbol": crypto["symbol"], "name": crypto["name"], "current_price": crypto["current_price"]}
+        if entry is not None:
+            series = entry["data"]
+            record["trend"] = series.trend
+            record["days"] = {field: series.column(field).tolist() for field in CHECKPOINT_FIELDS}
+            record["words"] = {
+                word_type: [values.tolist() for values in series.csr(word_type)]
+                for word_type in DailySeries.WORD_FIELDS
+            }
+            record["aggregates"] = {name: entry[name] for name in CHECKPOINT_AGGREGATES}
+            return record
+        
+        import numpy as np
+        
+        store = self.store
+        record["trend"] = store.trends[row]
+        record["days"] = {field: store.columns[field][row].tolist() for field in CHECKPOINT_FIELDS}
+        record["words"] = {}
+        for word_type in DailySeries.WORD_FIELDS:
+            counts = store.word_counts[word_type][row]
+            days, ids = counts.nonzero()
+            offsets = np.concatenate(([0], np.cumsum(np.bincount(days, minlength=len(counts)))))
+            record["words"][word_type] = [offsets.tolist(), ids.tolist(), counts[days, ids].tolist()]
+        return record
+    
+    def _restore_symbol(self, row, crypto, record):
+        """Rebuild a symbol from its checkpoint record, as _simulate_symbol would have built it"""
+        days, words = record["days"], record["words"]
+        if self.store is not None:
+            import numpy as np
             
-            # Base sentiment bias (some coins are more popular/controversial)
-            if crypto["symbol"] in ["BTC", "ETH", "SOL"]:
-                base_positive_bias = random.uniform(0.6, 0.8)
-            elif crypto["symbol"] in ["DOGE", "XRP"]:
-                base_positive_bias = random.uniform(0.45, 0.65)
-            else:
-                base_positive_bias = random.uniform(0.4, 0.6)
+            store = self.store
+            for field in CHECKPOINT_FIELDS:
+                store.columns[field][row] = days[field]
+            for word_type, (offsets, ids, counts) in words.items():
+                day_index = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+                store.word_counts[word_type][row, day_index, ids] = counts
+            store.trends[row] = record["trend"]
+            return None
+        
+        columns = dict(days, negative_sentiment=[1 - value for value in days["positive_sentiment"]])
+        series = DailySeries.from_arrays(
+            self.vocabularies, record["trend"], [date.strftime("%Y-%m-%d") for date in self.dates], columns,
+            *({word_type: words[word_type][part] for word_type in DailySeries.WORD_FIELDS} for part in range(3))
+        )
+        aggregates = record["aggregates"]
+        return {
+            "name": crypto["name"],
+            "symbol": crypto["symbol"],
+            "data": series,
+            "trend": series.trend,
+            "sentiment_price_correlation": aggregates["sentiment_price_correlation"],
+            "avg_daily_mentions": aggregates["avg_daily_mentions"],
+            "top_positive_words": [tuple(pair) for pair in aggregates["top_positive_words"]],
+            "top_negative_words": [tuple(pair) for pair in aggregates["top_negative_words"]]
+        }
+    
+    def _materialize_symbol(self, symbol):
+        """Simulate one symbol on first access from a LazySentimentData mapping"""
+        row = self._symbol_rows[symbol]
+        self.instrumentation.count("symbols_materialized")
+        return self._simulate_symbol(row, self.cryptocurrencies[row], self.symbol_rng(symbol))
+    
+    def _simulate_symbol(self, row, crypto, rng):
+        """Simulate every day of one cryptocurrency with the given random source
+        
+        Returns the symbol's sentiment_data entry, or None for the columnar
+        backend, where the days are written into the store's row instead.
+        """
+        instrumentation = self.instrumentation
+        timed = instrumentation.enabled
+        clock = time.perf_counter
+        draw_time = word_time = 0.0
+        
+        # Base sentiment bias (some coins are more popular/controversial)
+        if crypto["symbol"] in ["BTC", "ETH", "SOL"]:
+            base_positive_bias = rng.uniform(0.6, 0.8)
+        elif crypto["symbol"] in ["DOGE", "XRP"]:
+            base_positive_bias = rng.uniform(0.45, 0.65)
+        else:
+            base_positive_bias = rng.uniform(0.4, 0.6)
+        
+        # Choose random trends for this crypto
+        trend_pattern = rng.choice(TREND_PATTERNS)
+        sentiment_by_date = DailySeries(self.vocabularies, trend_pattern)
+        
+        current_price = crypto["current_price"]
+        
+        for i, date in enumerate(self.dates):
+            if timed:
+                day_start = clock()
+            date_str = date.strftime("%Y-%m-%d")
             
-            # Choose random trends for this crypto
-            trend_pattern = random.choice([
-                "uptrend", "downtrend", "volatile", "stable", "recovery", "correction"
-            ])
+            # Apply trend pattern to sentiment
+            if trend_pattern == "uptrend":
+                trend_modifier = min(0.15, 0.005 * i)
+            elif trend_pattern == "downtrend":
+                trend_modifier = max(-0.15, -0.005 * i)
+            elif trend_pattern == "volatile":
+                trend_modifier = 0.15 * math.sin(i/5)
+            elif trend_pattern == "recovery":
+                trend_modifier = 0.15 * (1 - math.exp(-i/15))
+            elif trend_pattern == "correction":
+                trend_modifier = -0.10 * (1 - math.exp(-i/10))
+            else:  # stable
+                trend_modifier = 0
             
-            # Track price changes for correlation with sentiment
-            price_changes = []
-            prices = []
-            current_price = crypto["current_price"]
+            # Add some randomness
+            daily_random = rng.uniform(-0.1, 0.1)
             
-            for i, date in enumerate(self.dates):
-                date_str = date.strftime("%Y-%m-%d")
-                
-                # Apply trend pattern to sentiment
-                if trend_pattern == "uptrend":
-                    trend_modifier = min(0.15, 0.005 * i)
-                elif trend_pattern == "downtrend":
-                    trend_modifier = max(-0.15, -0.005 * i)
-                elif trend_pattern == "volatile":
-                    trend_modifier = 0.15 * math.sin(i/5)
-                elif trend_pattern == "recovery":
-                    trend_modifier = 0.15 * (1 - math.exp(-i/15))
-                elif trend_pattern == "correction":
-                    trend_modifier = -0.10 * (1 - math.exp(-i/10))
-                else:  # stable
-                    trend_modifier = 0
-                
-                # Add some randomness
-                daily_random = random.uniform(-0.1, 0.1)
-                
-                # Calculate positive sentiment
-                positive_sentiment = base_positive_bias + trend_modifier + daily_random
-                positive_sentiment = max(0.1, min(0.9, positive_sentiment))
-                
-                # Calculate negative sentiment
-                negative_sentiment = 1 - positive_sentiment
-                
-                # Generate engagement metrics (mentions, posts, likes)
-                base_mentions = random.randint(5000, 50000)
-                if crypto["symbol"] in ["BTC", "ETH"]:
-                    base_mentions *= 3
-                elif crypto["symbol"] in ["SOL", "BNB", "XRP"]:
-                    base_mentions *= 2
-                
-                mentions = int(base_mentions * (1 + trend_modifier + daily_random))
-                posts = int(mentions * random.uniform(0.2, 0.4))
-                likes = int(posts * random.uniform(3, 15))
-                
-                # Simulated daily price change based on sentiment
-                price_change_pct = (positive_sentiment - 0.5) * 2 * random.uniform(0.5, 2.0)
-                if random.random() < 0.2:  # Sometimes price moves against sentiment
-                    price_change_pct *= -1
-                price_change = current_price * price_change_pct / 100
-                current_price += price_change
-                
-                price_changes.append(price_change_pct)
-                prices.append(current_price)
-                
-                # Generate word clouds
-                pos_word_counts = {}
-                neg_word_counts = {}
-                
-                for word in self.positive_words:
-                    if random.random() < positive_sentiment:
-                        pos_word_counts[word] = random.randint(1, int(mentions * 0.01))
-                
-                for word in self.negative_words:
-                    if random.random() < negative_sentiment:
-                        neg_word_counts[word] = random.randint(1, int(mentions * 0.01))
-                
-                # Store data for this date
-                sentiment_by_date[date_str] = {
-                    "positive_sentiment": positive_sentiment,
-                    "negative_sentiment": negative_sentiment,
-                    "mentions": mentions,
-                    "posts": posts,
-                    "likes": likes,
-                    "price": current_price,
-                    "price_change_pct": price_change_pct,
-                    "positive_words": pos_word_counts,
-                    "negative_words": neg_word_counts,
-                    "trend": trend_pattern
-                }
+            # Calculate positive sentiment
+            positive_sentiment = base_positive_bias + trend_modifier + daily_random
+            positive_sentiment = max(0.1, min(0.9, positive_sentiment))
             
-            # Calculate sentiment-price correlation
-            self.sentiment_data[crypto["symbol"]] = {
-                "name": crypto["name"],
-                "symbol": crypto["symbol"],
-                "data": sentiment_by_date,
-                "trend": trend_pattern,
-                "sentiment_price_correlation": self.calculate_correlation(
-                    [sentiment_by_date[date.strftime("%Y-%m-%d")]["positive_sentiment"] for date in self.dates],
-                    price_changes
-                ),
-                "avg_daily_mentions": sum(sentiment_by_date[date.strftime("%Y-%m-%d")]["mentions"] for date in self.dates) / len(self.dates),
-                "top_positive_words": self.get_top_words(sentiment_by_date, "positive_words"),
-                "top_negative_words": self.get_top_words(sentiment_by_date, "negative_words")
-            }
+            # Calculate negative sentiment
+            negative_sentiment = 1 - positive_sentiment
+            
+            # Generate engagement metrics (mentions, posts, likes)
+            base_mentions = rng.randint(5000, 50000)
+            if crypto["symbol"] in ["BTC", "ETH"]:
+                base_mentions *= 3
+            elif crypto["symbol"] in ["SOL", "BNB", "XRP"]:
+                base_mentions *= 2
+            
+            mentions = int(base_mentions * (1 + trend_modifier + daily_random))
+            posts = int(mentions * rng.uniform(0.2, 0.4))
+            likes = int(posts * rng.uniform(3, 15))
+            
+            # Simulated daily price change based on sentiment
+            price_change_pct = (positive_sentiment - 0.5) * 2 * rng.uniform(0.5, 2.0)
+            if rng.random() < 0.2:  # Sometimes price moves against sentiment
+                price_change_pct *= -1
+            price_change = current_price * price_change_pct / 100
+            current_price += price_change
+            
+            # Generate word clouds
+            if timed:
+                words_start = clock()
+                draw_time += words_start - day_start
+            pos_word_counts = {}
+            neg_word_counts = {}
+            
+            for word in self.positive_words:
+                if rng.random() < positive_sentiment:
+                    pos_word_counts[word] = rng.randint(1, int(mentions * 0.01))
+            
+            for word in self.negative_words:
+                if rng.random() < negative_sentiment:
+                    neg_word_counts[word] = rng.randint(1, int(mentions * 0.01))
+            if timed:
+                word_time += clock() - words_start
+            
+            if self.store is not None:
+                self.store.set_day(
+                    row, i, positive_sentiment, mentions, posts, likes,
+                    current_price, price_change_pct, pos_word_counts, neg_word_counts
+                )
+                continue
+            
+            # Store data for this date
+            sentiment_by_date.append(
+                date_str, positive_sentiment, negative_sentiment, mentions, posts, likes,
+                current_price, price_change_pct, pos_word_counts, neg_word_counts
+            )
+        
+        instrumentation.count("symbol_days_generated", len(self.dates))
+        instrumentation.count("words_sampled", len(self.dates) * (len(self.positive_words) + len(self.negative_words)))
+        
+        if timed:
+            instrumentation.add_time("generate_data.daily_draws", draw_time, calls=len(self.dates))
+            instrumentation.add_time("generate_data.word_clouds", word_time, calls=len(self.dates))
+        
+        if self.store is not None:
+            self.store.trends[row] = trend_pattern
+            return None
+        return self._symbol_entry(crypto, sentiment_by_date)
+    
+    def _symbol_entry(self, crypto, series):
+        """The sentiment_data entry for a symbol's DailySeries, with its per-symbol aggregates"""
+        instrumentation = self.instrumentation
+        
+        # Calculate sentiment-price correlation
+        with instrumentation.stage("correlation"):
+            correlation = self.calculate_correlation(series.column("positive_sentiment"), series.column("price_change_pct"))
+        with instrumentation.stage("top_words"):
+            top_positive_words = self.get_top_words(series, "positive_words")
+            top_negative_words = self.get_top_words(series, "negative_words")
+        
+        return {
+            "name": crypto["name"],
+            "symbol": crypto["symbol"],
+            "data": series,
+            "trend": series.trend,
+            "sentiment_price_correlation": correlation,
+            "avg_daily_mentions": sum(series.column("mentions")) / len(series) if len(series) else 0.0,
+            "top_positive_words": top_positive_words,
+            "top_negative_words": top_negative_words
+        }
+    
+    def load_source(self, source, symbols=None, start=None, end=None):
+        """Replace the data with observations fetched from a data source
+        
+        source is a sources.DataSource (anything with fetch(symbols, start,
+        end)); it is asked for the given symbols (the universe by default)
+        over self.dates, or over start..end (inclusive), which then become
+        self.dates. Correlation, average mentions and top words are
+        computed from the fetched days exactly as for simulated data.
+        Symbols the source does not return are left out.
+        """
+        with self.data_lock.write(), self.instrumentation.stage("load_source"):
+            self._load_source(source, symbols, start, end)
+    
+    def _load_source(self, source, symbols, start, end):
+        if symbols is None:
+            symbols = [crypto["symbol"] for crypto in self.cryptocurrencies]
+        if start is not None or end is not None:
+            self.start_date = to_datetime(start) if start is not None else self.start_date
+            self.end_date = to_datetime(end) if end is not None else self.end_date
+            self.dates = [
+                self.start_date + datetime.timedelta(days=i) for i in range((self.end_date - self.start_date).days + 1)
+            ]
+        start, end = self.dates[0].strftime("%Y-%m-%d"), self.dates[-1].strftime("%Y-%m-%d")
+        with self.instrumentation.stage("fetch"):
+            fetched = source.fetch(symbols, start, end)
+        
+        names = {crypto["symbol"]: crypto["name"] for crypto in self.cryptocurrencies}
+        self.store = None
+        self.sentiment_data = {}
+        self.data_origin = source.describe()
+        self.invalidate_summaries()
+        for symbol, fetched_entry in fetched.items():
+            trend = fetched_entry.get("trend", "stable")
+            sentiment_by_date = DailySeries(self.vocabularies, trend)
+            for date_str in sorted(fetched_entry["data"]):
+                sentiment_by_date[date_str] = _day_record(fetched_entry["data"][date_str], trend)
+            crypto = {"name": fetched_entry.get("name", names.get(symbol, symbol)), "symbol": symbol}
+            self.sentiment_data[symbol] = self._symbol_entry(crypto, sentiment_by_date)
+        self.instrumentation.count("symbols_loaded", len(self.sentiment_data))
+        self.instrumentation.count("symbol_days_loaded", sum(len(entry["data"]) for entry in self.sentiment_data.values()))
+        
+        if self.backend == "columnar":
+            self.store = ColumnarSentimentStore.from_sentiment_data(
+                self.sentiment_data, self.positive_words, self.negative_words, self._start_prices()
+            )
+            self.sentiment_data = ColumnarSentimentView(self.store)
+    
+    def generate_data_batch(self, seed=None):
+        """Generate simulated sentiment data for all cryptocurrencies at once with NumPy
+        
+        Draws the same distributions as generate_data() from a seeded
+        numpy.random.Generator, a block of symbols at a time, into a
+        columnar store. Without a seed, one is drawn from fresh entropy; either
+        way it is kept in self.seed.
+        """
+        with self.data_lock.write(), self.instrumentation.stage("generate_data_batch"):
+            self._generate_data_batch(seed)
+    
+    def _generate_data_batch(self, seed):
+        import numpy as np
+        
+        # Like the other generators, record the seed actually used so the run can be reproduced
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.data_origin = None
+        self.store = store = ColumnarSentimentStore(
+            self.cryptocurrencies, self.dates, self.positive_words, self.negative_words
+        )
+        trend_table = _trend_table(len(self.dates))
+        vocab_sizes = (len(self.positive_words), len(self.negative_words))
+        
+        for start in range(0, len(self.cryptocurrencies), BATCH_BLOCK_SYMBOLS):
+            block = slice(start, min(start + BATCH_BLOCK_SYMBOLS, len(self.cryptocurrencies)))
+            simulated = _simulate_block(self.cryptocurrencies[block], trend_table, vocab_sizes, rng)
+            for field, _ in store.NUMERIC_FIELDS:
+                store.columns[field][block] = simulated[field]
+            for word_type in store.WORD_FIELDS:
+                store.word_counts[word_type][block] = simulated[word_type]
+            store.trends[block] = [TREND_PATTERNS[code] for code in simulated["trend_codes"].tolist()]
+        
+        with self.instrumentation.stage("finalize"):
+            store.finalize()
+        self.sentiment_data = ColumnarSentimentView(store)
+        self.invalidate_summaries()
+        self.instrumentation.count("symbol_days_generated", len(store.symbols) * len(store.date_keys))
+        self.instrumentation.count(
+            "words_sampled", len(store.symbols) * len(store.date_keys) * (len(self.positive_words) + len(self.negative_words))
+        )
+    
+    def generate_data_parallel(self, workers=None, seed=None):
+        """Generate simulated sentiment data across a process pool
+        
+        Symbols are sharded across workers; each symbol draws from its own
+        stream (see symbol_seed_sequence), so results depend only on the seed,
+        never on the worker count. Workers write their rows straight into
+        shared memory, which is copied into the columnar store at the end.
+        """
+        with self.data_lock.write(), self.instrumentation.stage("generate_data_parallel"):
+            self._generate_data_parallel(workers, seed)
+    
+    def _generate_data_parallel(self, workers, seed):
+        import numpy as np
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+        
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.seed = seed
+        workers = workers or os.cpu_count() or 1
+        
+        self.data_origin = None
+        self.store = store = ColumnarSentimentStore(
+            self.cryptocurrencies, self.dates, self.positive_words, self.negative_words
+        )
+        arrays = dict(store.columns)
+        arrays.update(store.word_counts)
+        
+        segments = {}
+        try:
+            layout = {}
+            for field, values in arrays.items():
+                segments[field] = shared_memory.SharedMemory(create=True, size=max(1, values.nbytes))
+                layout[field] = (segments[field].name, values.shape, values.dtype.str)
+            
+            # Several shards per worker keeps the pool busy when symbols differ in cost
+            n_symbols = len(self.cryptocurrencies)
+            shard_size = max(1, -(-n_symbols // (workers * 4)))
+            shards = [
+                (layout, start, self.cryptocurrencies[start:start + shard_size], len(self.dates),
+                 (len(self.positive_words), len(self.negative_words)), seed)
+                for start in range(0, n_symbols, shard_size)
+            ]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for start, trend_codes in executor.map(_generate_shard, shards):
+                    store.trends[start:start + len(trend_codes)] = [TREND_PATTERNS[code] for code in trend_codes]
+            
+            for field, values in arrays.items():
+                shared = np.ndarray(values.shape, dtype=values.dtype, buffer=segments[field].buf)
+                np.copyto(values, shared)
+                del shared
+        finally:
+            for segment in segments.values():
+                segment.close()
+                segment.unlink()
+        
+        with self.instrumentation.stage("finalize"):
+            store.finalize()
+        self.sentiment_data = ColumnarSentimentView(store)
+        self.invalidate_summaries()
+        self.instrumentation.count("symbol_days_generated", len(store.symbols) * len(store.date_keys))
+        self.instrumentation.count(
+            "words_sampled", len(store.symbols) * len(store.date_keys) * (len(self.positive_words) + len(self.negative_words))
+        )
     
     def calculate_correlation(self, a, b):
         """Calculate Pearson correlation coefficient between two lists"""
@@ -175,64 +2313,374 @@ class CryptoSentimentAnalysis:
             numerator = n * sum_ab - sum_a * sum_b
             denominator = math.sqrt((n * sum_a2 - sum_a * sum_a) * (n * sum_b2 - sum_b * sum_b))
             return numerator / denominator if denominator != 0 else 0
-        except:
+        except (ValueError, ZeroDivisionError, OverflowError):
             return 0
     
+    def metric_matrix(self, metric):
+        """Return (symbols, date strings, 2-D float array) for a numeric day field
+        
+        Days a symbol has no observation for are NaN.
+        """
+        import numpy as np
+        
+        store = self.store
+        if store is not None:
+            if metric == "negative_sentiment":
+                values = 1 - store.columns["positive_sentiment"]
+            else:
+                values = store.columns[metric].astype("float64")
+            return list(store.symbols), list(store.date_keys), np.where(store.present, values, np.nan)
+        
+        symbols = list(self.sentiment_data)
+        dates = sorted({date_str for data in self.sentiment_data.values() for date_str in data["data"]})
+        date_index = {date_str: col for col, date_str in enumerate(dates)}
+        values = np.full((len(symbols), len(dates)), np.nan)
+        for row, symbol in enumerate(symbols):
+            for date_str, day_data in self.sentiment_data[symbol]["data"].items():
+                values[row, date_index[date_str]] = day_data[metric]
+        return symbols, dates, values
+    
+    def correlation_engine(self, x="positive_sentiment", y="price_change_pct"):
+        """Build a CorrelationEngine over two day fields for every symbol"""
+        symbols, dates, x_values = self.metric_matrix(x)
+        _, _, y_values = self.metric_matrix(y)
+        return CorrelationEngine(x_values, y_values, symbols, dates)
+    
+    def rolling_correlations(self, windows=(7, 14, 30)):
+        """Rolling sentiment-price correlations per window, each {symbol: [value or NaN per day]}"""
+        engine = self.correlation_engine()
+        return {
+            window: dict(zip(engine.symbols, engine.rolling(window).tolist()))
+            for window in windows
+        }
+    
+    def lagged_correlations(self, lags=range(1, 6)):
+        """Correlation of sentiment with price change `lag` days later, {symbol: {lag: value}}"""
+        lags = list(lags)
+        engine = self.correlation_engine()
+        return {
+            symbol: dict(zip(lags, row))
+            for symbol, row in zip(engine.symbols, engine.lagged(lags).tolist())
+        }
+    
+    def symbol_correlation_matrix(self, metric="positive_sentiment"):
+        """Return (symbols, matrix) with the pairwise correlation of a day field across symbols"""
+        symbols, dates, values = self.metric_matrix(metric)
+        return symbols, CorrelationEngine(values, values, symbols, dates).matrix()
+    
     def get_top_words(self, sentiment_by_date, word_type):
         """Get most common words across all dates"""
+        if isinstance(sentiment_by_date, DailySeries):
+            return sentiment_by_date.word_totals(word_type).most_common(5)
         all_words = Counter()
         for date_data in sentiment_by_date.values():
             for word, count in date_data[word_type].items():
                 all_words[word] += count
         return all_words.most_common(5)
     
-    def generate_ascii_chart(self, values, width=50, height=10, title="", labels=None):
-        """Generate an ASCII chart from a list of values"""
+    def word_matrix(self, symbol, word_type):
+        """Cached sparse days x vocabulary WordCountMatrix of a dict-backend symbol"""
+        matrix = self._word_matrices.get((symbol, word_type))
+        if matrix is None:
+            data = self.sentiment_data[symbol]["data"]
+            if isinstance(data, DailySeries):
+                matrix = WordCountMatrix.from_series(data, word_type)
+            else:
+                days = ((date_str, day_data[word_type]) for date_str, day_data in data.items())
+                matrix = WordCountMatrix.from_days(days, self.vocabularies[word_type])
+            self._word_matrices[(symbol, word_type)] = matrix
+        return matrix
+    
+    def top_words(self, symbol, word_type="positive_words", k=5, start=None, end=None):
+        """Top k (word, count) pairs for a symbol over an inclusive date range (all days by default)"""
+        if self.store is not None:
+            store = self.store
+            days = date_slice(store.date_keys, start, end)
+            totals = store.word_counts[word_type][store.symbol_index[symbol], days].sum(axis=0, dtype="int64")
+            return top_k_words(totals, store.vocab[word_type], k)
+        return self.word_matrix(symbol, word_type).top_k(k, start, end)
+    
+    def ingest(self, symbol, timestamp, record):
+        """Add or replace one day of observations for a symbol and update its aggregates"""
+        with self.data_lock.write():
+            self._ingest_one(symbol, timestamp, record)
+            self._refresh_aggregates(symbol)
+            self.invalidate_summaries([symbol])
+    
+    def ingest_batch(self, observations):
+        """Ingest an iterable of (symbol, timestamp, record) tuples
+        
+        Aggregates of each touched symbol are refreshed once at the end.
+        """
+        touched = set()
+        with self.data_lock.write():
+            for symbol, timestamp, record in observations:
+                self._ingest_one(symbol, timestamp, record)
+                touched.add(symbol)
+            self.invalidate_summaries(touched)
+            for symbol in touched:
+                self._refresh_aggregates(symbol)
+        return len(touched)
+    
+    def _ingest_one(self, symbol, timestamp, record):
+        if self.backend != "dict":
+            raise ValueError("Streaming ingestion requires the dict backend")
+        if isinstance(timestamp, str):
+            timestamp = datetime.datetime.strptime(timestamp[:10], "%Y-%m-%d")
+        
+        entry = self.sentiment_data.get(symbol)
+        if entry is None:
+            entry = self.sentiment_data[symbol] = {
+                "name": record.get("name", symbol),
+                "symbol": symbol,
+                "data": DailySeries(self.vocabularies, record.get("trend", "stable")),
+                "trend": record.get("trend", "stable")
+            }
+        
+        stream = self.streams.get(symbol)
+        if stream is None:
+            # Seed the accumulators from the history generated so far
+            stream = self.streams[symbol] = StreamingAggregates(entry["data"], self.window_days)
+            for date_str in stream.seed():
+                del entry["data"][date_str]
+        if not isinstance(entry, _StreamedEntry):
+            entry = self.sentiment_data[symbol] = _StreamedEntry(entry, stream)
+        
+        # Counts are integers, as DailySeries stores them, so a later replacement subtracts what was added
+        day_data = _day_record(record, entry["trend"])
+        evicted = stream.add(timestamp, day_data)
+        if evicted is None:
+            return  # Older than the sliding window
+        entry["data"][timestamp.strftime("%Y-%m-%d")] = day_data
+        for date_str in evicted:
+            del entry["data"][date_str]
+    
+    def _refresh_aggregates(self, symbol):
+        stream = self.streams[symbol]
+        entry = self.sentiment_data[symbol]
+        entry["sentiment_price_correlation"] = stream.correlation()
+        entry["avg_daily_mentions"] = stream.avg_daily_mentions()
+        # Recomputed from the stream on the next read (see _StreamedEntry)
+        for key in _StreamedEntry.TOP_WORDS:
+            entry.pop(key, None)
+    
+    def prefetch(self, symbols=None):
+        """Materialize the given symbols (all by default) up front; returns how many were simulated
+        
+        Only does work in lazy mode; eagerly generated data is already there.
+        """
+        if not isinstance(self.sentiment_data, LazySentimentData):
+            return 0
+        with self.instrumentation.stage("prefetch"):
+            return self.sentiment_data.prefetch(symbols)
+    
+    def add_invalidation_listener(self, listener):
+        """Call listener(symbols) whenever cached results for symbols (None: all) go stale"""
+        self._invalidation_listeners.append(listener)
+    
+    def symbol_summary(self, symbol):
+        """Memoized summary statistics for one symbol (see summaries)"""
+        summary = self._summaries.get(symbol)
+        if summary is None:
+            summary = self.summaries([symbol])[symbol]
+        return summary
+    
+    def summaries(self, symbols=None):
+        """Return {symbol: summary} for the given symbols (all by default)
+        
+        A summary holds the name, trend, day count, mean/min/max/stddev of
+        positive sentiment, total and average daily mentions, correlation, the
+        last SUMMARY_LAST_DAYS dates and sentiment values, and the top words.
+        Each is computed in one pass over the symbol's days and cached until
+        invalidate_summaries() is called for that symbol.
+        """
+        symbols = list(self.sentiment_data) if symbols is None else list(symbols)
+        missing = [symbol for symbol in symbols if symbol not in self._summaries]
+        if missing:
+            if self.store is not None:
+                self._summaries.update(self._columnar_summaries(missing))
+            else:
+                for symbol in missing:
+                    self._summaries[symbol] = self._dict_summary(symbol)
+        return {symbol: self._summaries[symbol] for symbol in symbols}
+    
+    def invalidate_summaries(self, symbols=None):
+        """Drop cached summaries and word-count matrices for the given symbols (all by default)
+        
+        Callbacks registered with add_invalidation_listener() are told too,
+        so caches built on top of this analyzer (e.g. query.QueryService)
+        drop their results for those symbols.
+        """
+        for listener in self._invalidation_listeners:
+            listener(None if symbols is None else list(symbols))
+        if symbols is None:
+            self._summaries.clear()
+            self._word_matrices.clear()
+        else:
+            for symbol in symbols:
+                self._summaries.pop(symbol, None)
+                for word_type in ("positive_words", "negative_words"):
+                    self._word_matrices.pop((symbol, word_type), None)
+    
+    def _dict_summary(self, symbol):
+        data = self.sentiment_data[symbol]
+        n = 0
+        total = total_squares = 0.0
+        low, high = math.inf, -math.inf
+        total_mentions = 0
+        last = deque(maxlen=SUMMARY_LAST_DAYS)
+        days = data["data"]
+        if isinstance(days, DailySeries):
+            rows = zip(days.dates, days.column("positive_sentiment"), days.column("mentions"))
+        else:
+            rows = ((date_str, day_data["positive_sentiment"], day_data["mentions"]) for date_str, day_data in days.items())
+        for date_str, value, mentions in rows:
+            n += 1
+            total += value
+            total_squares += value * value
+            low = min(low, value)
+            high = max(high, value)
+            total_mentions += mentions
+            last.append((date_str, value))
+        
+        mean = total / n if n else 0.0
+        return {
+            "symbol": symbol,
+            "name": data["name"],
+            "trend": data["trend"],
+            "days": n,
+            "sentiment_mean": mean,
+            "sentiment_min": low if n else 0.0,
+            "sentiment_max": high if n else 0.0,
+            "sentiment_std": math.sqrt(max(0.0, total_squares / n - mean * mean)) if n else 0.0,
+            "total_mentions": total_mentions,
+            "avg_daily_mentions": data["avg_daily_mentions"],
+            "correlation": data["sentiment_price_correlation"],
+            "last_dates": [date_str for date_str, _ in last],
+            "last_sentiment": [value for _, value in last],
+            "top_positive_words": data["top_positive_words"],
+            "top_negative_words": data["top_negative_words"]
+        }
+    
+    def _start_prices(self):
+        return {crypto["symbol"]: crypto["current_price"] for crypto in self.cryptocurrencies}
+    
+    def _columnar_summaries(self, symbols):
+        import numpy as np
+        
+        store = self.store
+        rows = [store.symbol_index[symbol] for symbol in symbols]
+        sentiment = store.columns["positive_sentiment"][rows]
+        last_dates = store.date_keys[-SUMMARY_LAST_DAYS:]
+        
+        # Days missing from a symbol (stores packed from dict data) are left out
+        present = store.present[rows]
+        days = present.sum(axis=1)
+        if present.all():
+            stats = (sentiment.mean(axis=1), sentiment.min(axis=1), sentiment.max(axis=1), sentiment.std(axis=1))
+        else:
+            # nan* reductions warn about symbols with no days at all; those are zeroed below
+            masked = np.where(present, sentiment, np.nan)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                stats = (np.nanmean(masked, axis=1), np.nanmin(masked, axis=1),
+                         np.nanmax(masked, axis=1), np.nanstd(masked, axis=1))
+            stats = tuple(np.where(days > 0, values, 0.0) for values in stats)
+        
+        columns = zip(
+            *(values.tolist() for values in stats),
+            np.where(present, store.columns["mentions"][rows], 0).sum(axis=1, dtype="int64").tolist(),
+            days.tolist(),
+            sentiment[:, -SUMMARY_LAST_DAYS:].tolist()
+        )
+        summaries = {}
+        for i, (symbol, row, (mean, low, high, std, total_mentions, n, last)) in enumerate(zip(symbols, rows, columns)):
+            dates = last_dates
+            if n < len(store.date_keys):
+                kept = present[i].nonzero()[0][-SUMMARY_LAST_DAYS:]
+                dates = [store.date_keys[col] for col in kept]
+                last = sentiment[i, kept].tolist()
+            summaries[symbol] = {
+                "symbol": symbol,
+                "name": store.names[row],
+                "trend": store.trends[row],
+                "days": n,
+                "sentiment_mean": mean,
+                "sentiment_min": low,
+                "sentiment_max": high,
+                "sentiment_std": std,
+                "total_mentions": total_mentions,
+                "avg_daily_mentions": float(store.avg_daily_mentions[row]),
+                "correlation": float(store.correlations[row]),
+                "last_dates": dates,
+                "last_sentiment": last,
+                "top_positive_words": store.top_words["positive_words"][row],
+                "top_negative_words": store.top_words["negative_words"][row]
+            }
+        return summaries
+    
+    def generate_ascii_chart(self, values, width=50, height=10, title="", labels=None, method="mean"):
+        """Generate an ASCII chart from a list of values
+        
+        Series longer than width are downsampled to one column per bucket
+        (method is "mean", "min", "max" or "lttb"); shorter ones are
+        stretched, so the chart is always exactly width columns wide. Bars
+        use the eighth-block characters for sub-cell vertical resolution.
+        """
+        with self.instrumentation.stage("generate_ascii_chart"):
+            return self._generate_ascii_chart(values, width, height, title, labels, method)
+    
+    def _generate_ascii_chart(self, values, width, height, title, labels, method):
         if not values:
             return "No data to display"
+        height = max(1, height)
         
-        min_val = min(values)
-        max_val = max(values)
+        # One value (and source index for its label) per output column
+        indices, columns = downsample(values, width, method)
+        
+        min_val = min(columns)
+        max_val = max(columns)
         value_range = max_val - min_val
         
         if value_range == 0:
             value_range = 1  # Avoid division by zero
         
-        # Characters for drawing
+        # Characters for drawing: index = filled eighths of a cell
         chars = " ▁▂▃▄▅▆▇█"
         
-        # Calculate scaled values
-        scaled_values = [int((val - min_val) / value_range * (height - 1)) for val in values]
+        # Bar height in eighths; the minimum still fills the bottom cell
+        levels = [8 + int(round((val - min_val) / value_range * (height - 1) * 8)) for val in columns]
         
         # Build chart
         chart = []
         chart.append(f"┌{'─' * width}┐")
-        chart.append(f"│ {title:<{width-2}} │")
+        chart.append(f"│ {title[:width - 2]:<{width-2}} │")
         chart.append(f"├{'─' * width}┤")
         
-        for i in range(height - 1, -1, -1):
-            line = "│"
-            for val in scaled_values:
-                if val >= i:
-                    line += "█"
-                else:
-                    line += " "
-            line += "│"
-            chart.append(line)
+        for row in range(height - 1, -1, -1):
+            # Character for every possible level in this row
+            row_chars = [chars[min(8, max(0, level - 8 * row))] for level in range(8 * height + 1)]
+            chart.append("│" + "".join([row_chars[level] for level in levels]) + "│")
         
         chart.append(f"└{'─' * width}┘")
         
-        # Add labels if provided
+        # Add labels if provided, each under the first column of its value, skipping overlaps
         if labels:
-            label_str = ""
-            step = max(1, len(labels) // (width - 2))
-            for i in range(0, len(labels), step):
-                if i < len(labels):
-                    label_str += f"{labels[i]}"
-                    if i + step < len(labels):
-                        spaces = step - len(labels[i])
-                        label_str += " " * spaces
-            chart.append(label_str[:width])
+            label_row = [" "] * width
+            next_free = 0
+            previous = None
+            for column, index in enumerate(indices):
+                if index == previous:
+                    continue
+                previous = index
+                if column < next_free:
+                    continue
+                label = str(labels[index])
+                if column + len(label) > width:
+                    break
+                label_row[column:column + len(label)] = label
+                next_free = column + len(label) + 1
+            chart.append(" " + "".join(label_row).rstrip())
         
         return "\n".join(chart)
     
@@ -248,75 +2696,138 @@ class CryptoSentimentAnalysis:
         bar = f"{label:15} │{'█' * bar_width}{' ' * (max_width - bar_width)}│ {value_display}"
         return bar
     
-    def generate_report(self):
+    def iter_report(self, sections=None):
+        """Yield the report line by line (charts as multi-line chunks)
+        
+        sections selects a subset of REPORT_SECTIONS by name; they are always
+        rendered in report order and unselected sections are never computed.
+        """
+        if sections is None:
+            selected = REPORT_SECTIONS
+        else:
+            selected = set(sections)
+            unknown = selected.difference(REPORT_SECTIONS)
+            if unknown:
+                raise ValueError(f"Unknown report sections: {', '.join(sorted(unknown))}")
+        
+        instrumentation = self.instrumentation
+        for name in REPORT_SECTIONS:
+            if name in selected:
+                lines = getattr(self, f"_report_{name}")()
+                if instrumentation.enabled:
+                    lines = instrumentation.timed_iter(f"report.{name}", lines, "lines_rendered")
+                yield from lines
+    
+    def write_report(self, file, sections=None, chunk_lines=256):
+        """Stream the report to a writable text file object, flushing every chunk_lines lines
+        
+        Produces exactly the text of generate_report() without holding it in memory.
+        Returns the number of characters written.
+        """
+        written = 0
+        chunk = []
+        first = True
+        for line in self.iter_report(sections):
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                text = ("" if first else "\n") + "\n".join(chunk)
+                written += file.write(text) or 0
+                chunk = []
+                first = False
+        if chunk:
+            text = ("" if first else "\n") + "\n".join(chunk)
+            written += file.write(text) or 0
+        self.instrumentation.count("characters_written", written)
+        return written
+    
+    def generate_report(self, sections=None):
         """Generate a comprehensive report with sentiment analysis"""
-        report = []
-        
-        # Title
-        report.append("=" * 80)
-        report.append("CRYPTOCURRENCY SOCIAL MEDIA SENTIMENT ANALYSIS REPORT".center(80))
-        report.append(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}".center(80))
-        report.append("=" * 80)
-        report.append("")
-        
-        # Introduction
-        report.append("INTRODUCTION")
-        report.append("-" * 80)
-        report.append("This report analyzes social media sentiment for the top 10 cryptocurrencies over")
-        report.append("the past 30 days. The data includes positive and negative sentiment ratios,")
-        report.append("social media mentions, engagement, and correlation with price movements.")
-        report.append("")
-        
-        # Overall sentiment comparison
-        report.append("OVERALL SENTIMENT COMPARISON")
-        report.append("-" * 80)
-        report.append("Positive sentiment ratio across cryptocurrencies:")
-        report.append("")
+        return "\n".join(self.iter_report(sections))
+    
+    def _report_header(self):
+        """Title block with the generation timestamp"""
+        yield "=" * 80
+        yield "CRYPTOCURRENCY SOCIAL MEDIA SENTIMENT ANALYSIS REPORT".center(80)
+        yield f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}".center(80)
+        yield "=" * 80
+        yield ""
+    
+    def _report_introduction(self):
+        """Introduction to the report"""
+        yield "INTRODUCTION"
+        yield "-" * 80
+        count = len(self.sentiment_data)
+        if self.cryptocurrencies == TOP_CRYPTOCURRENCIES:
+            subject = "the top 10 cryptocurrencies"
+        else:
+            subject = f"{count} {'cryptocurrency' if count == 1 else 'cryptocurrencies'}"
+        yield from textwrap.wrap(
+            f"This report analyzes social media sentiment for {subject} over the past {self._report_days()} days. "
+            "The data includes positive and negative sentiment ratios, social media mentions, engagement, "
+            "and correlation with price movements.", 80
+        )
+        yield ""
+    
+    def _report_days(self):
+        """Days covered by the data (the `days` argument for simulated data)"""
+        return max(len(self.dates) - 1, 0)
+    
+    def _featured_symbols(self, preferred):
+        """The preferred symbols that are present, else as many of the most mentioned symbols"""
+        present = [symbol for symbol in preferred if symbol in self.sentiment_data]
+        if present:
+            return present
+        ranked = sorted(self.summaries().items(), key=lambda item: item[1]["avg_daily_mentions"], reverse=True)
+        return [symbol for symbol, _ in ranked[:len(preferred)]]
+    
+    def _report_overall(self):
+        """Overall sentiment comparison across cryptocurrencies"""
+        yield "OVERALL SENTIMENT COMPARISON"
+        yield "-" * 80
+        yield "Positive sentiment ratio across cryptocurrencies:"
+        yield ""
         
         # Sort cryptocurrencies by average positive sentiment
-        avg_sentiments = []
-        for symbol, data in self.sentiment_data.items():
-            avg_pos_sentiment = sum(day_data["positive_sentiment"] for day_data in data["data"].values()) / len(data["data"])
-            avg_sentiments.append((symbol, avg_pos_sentiment))
-        
+        avg_sentiments = [(symbol, summary["sentiment_mean"]) for symbol, summary in self.summaries().items()]
         avg_sentiments.sort(key=lambda x: x[1], reverse=True)
         
         for symbol, avg_sentiment in avg_sentiments:
-            report.append(self.generate_horizontal_bar(
+            yield self.generate_horizontal_bar(
                 avg_sentiment, 
                 label=f"{symbol}",
                 max_width=40
-            ))
+            )
         
-        report.append("")
-        report.append("INSIGHTS:")
+        yield ""
+        yield "INSIGHTS:"
         most_positive = avg_sentiments[0][0]
         least_positive = avg_sentiments[-1][0]
-        report.append(f"• {self.sentiment_data[most_positive]['name']} ({most_positive}) has the most positive sentiment overall.")
-        report.append(f"• {self.sentiment_data[least_positive]['name']} ({least_positive}) has the least positive sentiment overall.")
+        yield f"• {self.sentiment_data[most_positive]['name']} ({most_positive}) has the most positive sentiment overall."
+        yield f"• {self.sentiment_data[least_positive]['name']} ({least_positive}) has the least positive sentiment overall."
         
         # Add insights about why some might be more positive than others
         if most_positive in ["BTC", "ETH", "SOL"]:
-            report.append(f"• Major cryptocurrencies like {most_positive} tend to have more positive sentiment due")
-            report.append("  to their established market position and wider adoption.")
+            yield f"• Major cryptocurrencies like {most_positive} tend to have more positive sentiment due"
+            yield "  to their established market position and wider adoption."
         
-        report.append("")
-        
-        # Sentiment trends over time
-        report.append("SENTIMENT TRENDS OVER TIME")
-        report.append("-" * 80)
-        report.append("The following charts show how positive sentiment has changed over the past 30 days")
-        report.append("for selected cryptocurrencies:")
-        report.append("")
+        yield ""
+    
+    def _report_trends(self):
+        """Sentiment trend charts for selected cryptocurrencies"""
+        yield "SENTIMENT TRENDS OVER TIME"
+        yield "-" * 80
+        yield f"The following charts show how positive sentiment has changed over the past {self._report_days()} days"
+        yield "for selected cryptocurrencies:"
+        yield ""
         
         # Select a few interesting cryptocurrencies to show trends
-        trend_cryptos = ["BTC", "ETH", "SOL", "DOGE", "XRP"]
+        trend_cryptos = self._featured_symbols(REPORT_TREND_SYMBOLS)
         
         for symbol in trend_cryptos:
-            data = self.sentiment_data[symbol]
-            dates = list(data["data"].keys())[-14:]  # Last 14 days for readability
-            values = [data["data"][date]["positive_sentiment"] for date in dates]
-            short_dates = [date[-5:] for date in dates]  # MM-DD format
+            data = self.symbol_summary(symbol)
+            # Last 14 days for readability
+            values = data["last_sentiment"]
+            short_dates = [date[-5:] for date in data["last_dates"]]  # MM-DD format
             
             chart = self.generate_ascii_chart(
                 values, 
@@ -325,188 +2836,397 @@ class CryptoSentimentAnalysis:
                 title=f"{data['name']} ({symbol}) Positive Sentiment", 
                 labels=short_dates
             )
-            report.append(chart)
-            report.append("")
+            yield chart
+            yield ""
             
             # Add trend insight
             trend = data["trend"]
             if trend == "uptrend":
-                report.append(f"➤ {symbol} shows an upward sentiment trend, indicating growing community optimism.")
+                yield f"➤ {symbol} shows an upward sentiment trend, indicating growing community optimism."
             elif trend == "downtrend":
-                report.append(f"➤ {symbol} displays a declining sentiment trend, suggesting increasing community concern.")
+                yield f"➤ {symbol} displays a declining sentiment trend, suggesting increasing community concern."
             elif trend == "volatile":
-                report.append(f"➤ {symbol} exhibits volatile sentiment, reflecting market uncertainty and mixed opinions.")
+                yield f"➤ {symbol} exhibits volatile sentiment, reflecting market uncertainty and mixed opinions."
             elif trend == "recovery":
-                report.append(f"➤ {symbol} demonstrates sentiment recovery, indicating improving community perception.")
+                yield f"➤ {symbol} demonstrates sentiment recovery, indicating improving community perception."
             elif trend == "correction":
-                report.append(f"➤ {symbol} shows sentiment correction after previous highs, suggesting market normalization.")
+                yield f"➤ {symbol} shows sentiment correction after previous highs, suggesting market normalization."
             else:
-                report.append(f"➤ {symbol} maintains relatively stable sentiment throughout the period.")
+                yield f"➤ {symbol} maintains relatively stable sentiment throughout the period."
             
-            report.append("")
-        
-        # Sentiment-Price Correlation
-        report.append("SENTIMENT-PRICE CORRELATION")
-        report.append("-" * 80)
-        report.append("Correlation between positive sentiment and price changes:")
-        report.append("")
+            yield ""
+    
+    def _report_correlation(self):
+        """Sentiment-price correlation per cryptocurrency"""
+        yield "SENTIMENT-PRICE CORRELATION"
+        yield "-" * 80
+        yield "Correlation between positive sentiment and price changes:"
+        yield ""
         
         # Sort cryptocurrencies by correlation
-        correlations = [(symbol, data["sentiment_price_correlation"]) 
-                         for symbol, data in self.sentiment_data.items()]
+        correlations = [(symbol, summary["correlation"]) 
+                         for symbol, summary in self.summaries().items()]
         correlations.sort(key=lambda x: abs(x[1]), reverse=True)
         
         for symbol, correlation in correlations:
-            report.append(self.generate_horizontal_bar(
+            yield self.generate_horizontal_bar(
                 abs(correlation), 
                 label=f"{symbol}",
                 max_width=40,
                 percent=False
-            ))
+            )
             direction = "positive" if correlation > 0 else "negative"
             strength = "strong" if abs(correlation) > 0.7 else "moderate" if abs(correlation) > 0.3 else "weak"
-            report.append(f"   Direction: {direction}, Strength: {strength}")
-            report.append("")
+            yield f"   Direction: {direction}, Strength: {strength}"
+            yield ""
         
-        report.append("INSIGHTS:")
+        yield "INSIGHTS:"
         high_corr_crypto = correlations[0][0]
         high_corr_value = correlations[0][1]
-        report.append(f"• {self.sentiment_data[high_corr_crypto]['name']} ({high_corr_crypto}) shows the strongest")
-        report.append(f"  {'positive' if high_corr_value > 0 else 'negative'} correlation between sentiment and price movements.")
+        yield f"• {self.sentiment_data[high_corr_crypto]['name']} ({high_corr_crypto}) shows the strongest"
+        yield f"  {'positive' if high_corr_value > 0 else 'negative'} correlation between sentiment and price movements."
         
         if any(abs(corr) < 0.2 for _, corr in correlations):
             low_corr_cryptos = [symbol for symbol, corr in correlations if abs(corr) < 0.2]
-            report.append(f"• {', '.join(low_corr_cryptos)} show weak correlation between sentiment and price,")
-            report.append("  suggesting other factors may be more influential for these assets.")
-        
-        report.append("")
+            yield f"• {', '.join(low_corr_cryptos)} show weak correlation between sentiment and price,"
+            yield "  suggesting other factors may be more influential for these assets."
         
-        # Social Media Engagement
-        report.append("SOCIAL MEDIA ENGAGEMENT")
-        report.append("-" * 80)
-        report.append("Average daily mentions across social media platforms:")
-        report.append("")
+        yield ""
+    
+    def _report_engagement(self):
+        """Social media engagement (average daily mentions)"""
+        yield "SOCIAL MEDIA ENGAGEMENT"
+        yield "-" * 80
+        yield "Average daily mentions across social media platforms:"
+        yield ""
         
         # Sort cryptocurrencies by average mentions
-        mentions = [(symbol, data["avg_daily_mentions"]) 
-                     for symbol, data in self.sentiment_data.items()]
+        mentions = [(symbol, summary["avg_daily_mentions"]) 
+                     for symbol, summary in self.summaries().items()]
         mentions.sort(key=lambda x: x[1], reverse=True)
         
         max_mentions = max(m for _, m in mentions)
         
         for symbol, avg_mentions in mentions:
             normalized = avg_mentions / max_mentions
-            report.append(self.generate_horizontal_bar(
+            yield self.generate_horizontal_bar(
                 normalized, 
                 label=f"{symbol}",
                 max_width=40,
                 percent=False
-            ) + f" ({int(avg_mentions):,} mentions)")
+            ) + f" ({int(avg_mentions):,} mentions)"
         
-        report.append("")
-        report.append("INSIGHTS:")
+        yield ""
+        yield "INSIGHTS:"
         most_mentioned = mentions[0][0]
         least_mentioned = mentions[-1][0]
-        report.append(f"• {self.sentiment_data[most_mentioned]['name']} ({most_mentioned}) dominates social media")
-        report.append(f"  conversations with approximately {int(mentions[0][1]):,} daily mentions.")
-        report.append(f"• Despite having lower mentions, {least_mentioned} still generates significant")
-        report.append(f"  engagement with {int(mentions[-1][1]):,} daily mentions.")
+        yield f"• {self.sentiment_data[most_mentioned]['name']} ({most_mentioned}) dominates social media"
+        yield f"  conversations with approximately {int(mentions[0][1]):,} daily mentions."
+        yield f"• Despite having lower mentions, {least_mentioned} still generates significant"
+        yield f"  engagement with {int(mentions[-1][1]):,} daily mentions."
         
         # Add insight about market leaders
         if mentions[0][0] in ["BTC", "ETH"]:
-            report.append("• Market leaders typically dominate social media conversations, reflecting their")
-            report.append("  larger community size and broader market influence.")
-        
-        report.append("")
+            yield "• Market leaders typically dominate social media conversations, reflecting their"
+            yield "  larger community size and broader market influence."
         
-        # Popular Terms Analysis
-        report.append("POPULAR TERMS IN SOCIAL MEDIA DISCUSSIONS")
-        report.append("-" * 80)
+        yield ""
+    
+    def _report_terms(self):
+        """Popular positive and negative terms for selected cryptocurrencies"""
+        yield "POPULAR TERMS IN SOCIAL MEDIA DISCUSSIONS"
+        yield "-" * 80
         
         # Select a few cryptocurrencies for detailed word analysis
-        word_analysis_cryptos = ["BTC", "ETH", "SOL", "DOGE"]
+        word_analysis_cryptos = self._featured_symbols(REPORT_TERM_SYMBOLS)
         
         for symbol in word_analysis_cryptos:
-            data = self.sentiment_data[symbol]
-            report.append(f"{data['name']} ({symbol}):")
+            data = self.symbol_summary(symbol)
+            yield f"{data['name']} ({symbol}):"
             
-            report.append("  Positive terms:")
+            yield "  Positive terms:"
             for word, count in data["top_positive_words"]:
-                report.append(f"    • {word}: {count:,} mentions")
+                yield f"    • {word}: {count:,} mentions"
             
-            report.append("  Negative terms:")
+            yield "  Negative terms:"
             for word, count in data["top_negative_words"]:
-                report.append(f"    • {word}: {count:,} mentions")
+                yield f"    • {word}: {count:,} mentions"
             
-            report.append("")
-        
-        # Conclusion and Recommendations
-        report.append("CONCLUSION AND INSIGHTS")
-        report.append("-" * 80)
+            yield ""
+    
+    def _report_conclusion(self):
+        """Conclusion and key findings"""
+        yield "CONCLUSION AND INSIGHTS"
+        yield "-" * 80
         
         # Identify most positive trending crypto
-        uptrend_cryptos = [symbol for symbol, data in self.sentiment_data.items() 
+        summaries = self.summaries()
+        uptrend_cryptos = [symbol for symbol, data in summaries.items() 
                           if data["trend"] in ["uptrend", "recovery"]]
         
-        downtrend_cryptos = [symbol for symbol, data in self.sentiment_data.items() 
+        downtrend_cryptos = [symbol for symbol, data in summaries.items() 
                             if data["trend"] in ["downtrend", "correction"]]
         
-        report.append("Key findings from the sentiment analysis:")
-        report.append("")
+        yield "Key findings from the sentiment analysis:"
+        yield ""
         
         if uptrend_cryptos:
-            report.append(f"• Positive sentiment trends: {', '.join(uptrend_cryptos)}")
-            report.append("  These cryptocurrencies show improving sentiment, potentially indicating")
-            report.append("  growing community support and positive market perception.")
+            yield f"• Positive sentiment trends: {', '.join(uptrend_cryptos)}"
+            yield "  These cryptocurrencies show improving sentiment, potentially indicating"
+            yield "  growing community support and positive market perception."
         
         if downtrend_cryptos:
-            report.append(f"• Negative sentiment trends: {', '.join(downtrend_cryptos)}")
-            report.append("  These cryptocurrencies show declining sentiment, which might suggest")
-            report.append("  decreasing confidence or emerging concerns in the community.")
+            yield f"• Negative sentiment trends: {', '.join(downtrend_cryptos)}"
+            yield "  These cryptocurrencies show declining sentiment, which might suggest"
+            yield "  decreasing confidence or emerging concerns in the community."
         
         # Find cryptos with strong positive correlation
-        strong_pos_corr = [symbol for symbol, data in self.sentiment_data.items() 
-                          if data["sentiment_price_correlation"] > 0.5]
+        strong_pos_corr = [symbol for symbol, data in summaries.items() 
+                          if data["correlation"] > 0.5]
         
         if strong_pos_corr:
-            report.append(f"• Strong positive sentiment-price correlation: {', '.join(strong_pos_corr)}")
-            report.append("  For these assets, social media sentiment appears to be a leading indicator")
-            report.append("  of price movements, suggesting potential predictive value.")
-        
-        report.append("")
-        report.append("METHODOLOGY NOTE")
-        report.append("-" * 80)
-        report.append("This report uses simulated data to demonstrate sentiment analysis techniques.")
-        report.append("In a real-world application, data would be sourced from social media platforms,")
-        report.append("news sources, and specialized crypto sentiment analysis services like LunarCrush,")
-        report.append("Santiment, or the Crypto Fear and Greed Index.")
-        report.append("")
-        
-        return "\n".join(report)
-    
-    def save_report(self, filename="crypto_sentiment_report.txt"):
-        """Save the report to a text file"""
-        report = self.generate_report()
-        with open(filename, "w") as f:
-            f.write(report)
+            yield f"• Strong positive sentiment-price correlation: {', '.join(strong_pos_corr)}"
+            yield "  For these assets, social media sentiment appears to be a leading indicator"
+            yield "  of price movements, suggesting potential predictive value."
+        
+        yield ""
+    
+    def _report_methodology(self):
+        """Methodology note on where the data came from"""
+        yield "METHODOLOGY NOTE"
+        yield "-" * 80
+        if self.data_origin is not None:
+            yield from textwrap.wrap(
+                f"This report uses observations loaded from {self.data_origin}. Sentiment, engagement "
+                "and price figures are reported as provided by that source.",
+                80, break_long_words=False, break_on_hyphens=False
+            )
+            yield ""
+            return
+        yield "This report uses simulated data to demonstrate sentiment analysis techniques."
+        yield "In a real-world application, data would be sourced from social media platforms,"
+        yield "news sources, and specialized crypto sentiment analysis services like LunarCrush,"
+        yield "Santiment, or the Crypto Fear and Greed Index."
+        yield ""
+    
+    def save_report(self, filename="crypto_sentiment_report.txt", sections=None, report=None):
+        """Save the report to a text file, streaming it section by section
+        
+        An already rendered report (from generate_report) can be passed to
+        write it as is instead of rendering it again.
+        """
+        with self.instrumentation.stage("save_report"):
+            with open(filename, "w") as f:
+                if report is None:
+                    self.write_report(f, sections)
+                else:
+                    f.write(report)
+                self.instrumentation.count("bytes_written", f.tell())
         return f"Report saved to {filename}"
     
-    def save_data(self, filename="crypto_sentiment_data.json"):
-        """Save the generated data to a JSON file for further analysis"""
-        with open(filename, "w") as f:
-            json.dump(self.sentiment_data, f, indent=2)
+    def render_outputs(self, output_dir=".", formats=("text", "html", "json"), per_symbol=False, force=False, workers=None):
+        """Render the text report, HTML dashboard and JSON summary concurrently (see render.ReportRenderer)
+        
+        Only outputs whose input data changed since the last run in output_dir
+        are rewritten. Returns {path: "written" | "unchanged"}.
+        """
+        from render import ReportRenderer
+        
+        with self.instrumentation.stage("render_outputs"):
+            return ReportRenderer(self, output_dir, workers=workers).render(formats, per_symbol, force)
+    
+    def save_data(self, filename="crypto_sentiment_data.json", format="json"):
+        """Save the generated data to a JSON file (or a binary snapshot) for further analysis"""
+        if format == "snapshot":
+            store = self.store
+            if store is None:
+                store = ColumnarSentimentStore.from_sentiment_data(
+                    self.sentiment_data, self.positive_words, self.negative_words, self._start_prices()
+                )
+            with self.instrumentation.stage("save_snapshot"):
+                store.save_snapshot(filename, self.data_origin)
+            self.instrumentation.count("bytes_written", os.path.getsize(filename))
+            return f"Snapshot saved to {filename}"
+        if format != "json":
+            raise ValueError(f"Unknown data format {format!r}, expected 'json' or 'snapshot'")
+        
+        with self.instrumentation.stage("save_data"):
+            with open(filename, "w") as f:
+                json.dump(self.sentiment_data, f, indent=2, default=_json_default)
+                self.instrumentation.count("bytes_written", f.tell())
         return f"Data saved to {filename}"
+    
+    def save_history(self, directory="crypto_sentiment_history"):
+        """Append the current data to a partitioned history store (see history.HistoryStore)"""
+        from history import HistoryStore
+        
+        with self.instrumentation.stage("save_history"):
+            store = HistoryStore(directory)
+            written = store.append_many(
+                ((symbol, date_str, day_data)
+                 for symbol, data in self.sentiment_data.items() for date_str, day_data in data["data"].items()),
+                {symbol: {"name": data["name"], "trend": data["trend"]} for symbol, data in self.sentiment_data.items()}
+            )
+        self.instrumentation.count("records_written", written)
+        return f"History saved to {directory} ({written:,} day records)"
+    
+    def load_snapshot(self, filename, symbols=None):
+        """Replace the current data with a memory-mapped binary snapshot
+        
+        symbols restricts sentiment_data (and so the report and summaries)
+        to a subset of the snapshot's symbols; unknown symbols raise KeyError.
+        """
+        store = ColumnarSentimentStore.load_snapshot(filename)
+        if symbols is not None:
+            symbols = list(symbols)
+            unknown = [symbol for symbol in symbols if symbol not in store.symbol_index]
+            if unknown:
+                raise KeyError(f"Symbols not in snapshot {filename}: {', '.join(unknown)}")
+        with self.data_lock.write():
+            self._use_snapshot(store, symbols)
+        return self
+    
+    def _use_snapshot(self, store, symbols):
+        self.backend = "columnar"
+        self.store = store
+        self.data_origin = store.origin
+        self.sentiment_data = ColumnarSentimentView(store, symbols)
+        self.invalidate_summaries()
+        self.cryptocurrencies = [
+            {"name": store.names[row], "symbol": symbol, "current_price": float(store.start_prices[row])}
+            for symbol, row in ((symbol, store.symbol_index[symbol]) for symbol in self.sentiment_data)
+        ]
+        self._symbol_rows = {crypto["symbol"]: row for row, crypto in enumerate(self.cryptocurrencies)}
+        self.dates = [datetime.datetime.strptime(date_str, "%Y-%m-%d") for date_str in store.date_keys]
+        if self.dates:
+            self.start_date, self.end_date = self.dates[0], self.dates[-1]
+    
+    @classmethod
+    def from_snapshot(cls, filename, symbols=None):
+        """Create an analyzer over a binary snapshot (or some of its symbols) without generating any data"""
+        return cls(backend="columnar", generator=None).load_snapshot(filename, symbols)
+
+
+def _split_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
+
+def build_parser():
+    """Command line interface: generate, report and export subcommands"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--symbols", help="comma-separated symbols to include (default: the top 10)")
+    common.add_argument("--days", type=int, help="days of history to simulate (default: 30)")
+    common.add_argument("--seed", type=int, help="random seed, to reproduce an earlier run")
+    common.add_argument("--end-date", help="last simulated day as YYYY-MM-DD (default: today)")
+    common.add_argument("--backend", choices=BACKENDS, help="storage backend (default: dict)")
+    common.add_argument("--snapshot", help="load data from a binary snapshot instead of simulating it")
+    
+    parser = argparse.ArgumentParser(description="Simulated cryptocurrency social media sentiment analysis")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    
+    generate = commands.add_parser("generate", parents=[common], help="simulate data and save it")
+    generate.add_argument("--format", choices=("json", "snapshot", "history"), default="json",
+                          help="JSON file, binary snapshot or partitioned history directory (default: json)")
+    generate.add_argument("-o", "--output", help="output file or directory (default depends on --format)")
+    generate.add_argument("--checkpoint", help="checkpoint file for resuming an interrupted generation")
+    
+    report = commands.add_parser("report", parents=[common], help="write the text report")
+    report.add_argument("--sections", help=f"comma-separated subset of: {', '.join(REPORT_SECTIONS)}")
+    report.add_argument("-o", "--output", help="file to write (default: standard output)")
+    
+    export = commands.add_parser("export", parents=[common], help="render the report as text, HTML and JSON files")
+    export.add_argument("--format", default="text,html,json", help="comma-separated output formats (default: all)")
+    export.add_argument("--output-dir", default=".", help="directory to write to (default: .)")
+    export.add_argument("--per-symbol", action="store_true", help="also write one JSON summary per symbol")
+    export.add_argument("--force", action="store_true", help="rewrite outputs even if their data is unchanged")
+    return parser
+
+
+def build_analyzer(args, parser, checkpoint=None):
+    """The analyzer a command runs on: loaded from --snapshot, else simulated for --symbols"""
+    # Symbols are matched case-insensitively; repeats are dropped
+    symbols = _split_list(args.symbols)
+    if symbols is not None:
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    simulation = {"days": args.days, "seed": args.seed, "backend": args.backend, "end_date": args.end_date,
+                  "checkpoint": checkpoint}
+    simulation = {name: value for name, value in simulation.items() if value is not None}
+    
+    if args.snapshot:
+        # A snapshot is already-simulated data, so simulation options cannot apply to it
+        if simulation:
+            options = ", ".join("--" + name.replace("_", "-") for name in simulation)
+            parser.error(f"--snapshot cannot be combined with {options}")
+        try:
+            return CryptoSentimentAnalysis.from_snapshot(args.snapshot, symbols)
+        except KeyError as exc:
+            parser.error(exc.args[0])
+        except OSError as exc:
+            parser.error(f"Cannot read snapshot {args.snapshot}: {exc.strerror or exc}")
+    
+    cryptocurrencies = None
+    if symbols is not None:
+        known = {crypto["symbol"]: crypto for crypto in TOP_CRYPTOCURRENCIES}
+        unknown = [symbol for symbol in symbols if symbol not in known]
+        if unknown:
+            parser.error(f"Cannot simulate unknown symbols: {', '.join(unknown)} "
+                         f"(simulated symbols: {', '.join(known)}; use --snapshot for others)")
+        cryptocurrencies = [known[symbol] for symbol in symbols]
+    return CryptoSentimentAnalysis(cryptocurrencies=cryptocurrencies, **simulation)
 
 
-def main():
-    analyzer = CryptoSentimentAnalysis()
-    report = analyzer.generate_report()
-    print(report)
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.command is None:
+        # No command: print the report and save it along with the data, rendering it once
+        analyzer = CryptoSentimentAnalysis()
+        with analyzer.instrumentation.stage("generate_report"):
+            report = analyzer.generate_report()
+        print(report)
+        print(analyzer.save_report(report=report))
+        print(analyzer.save_data())
+    
+    elif args.command == "generate":
+        analyzer = build_analyzer(args, parser, args.checkpoint)
+        if analyzer.seed is not None:
+            print(f"Generated {len(analyzer.sentiment_data)} symbols x {len(analyzer.dates)} days with seed {analyzer.seed}")
+        if args.format == "history":
+            print(analyzer.save_history(args.output or "crypto_sentiment_history"))
+        else:
+            default = "crypto_sentiment_data.json" if args.format == "json" else "crypto_sentiment_data.snapshot"
+            print(analyzer.save_data(args.output or default, args.format))
+    
+    elif args.command == "report":
+        sections = _split_list(args.sections)
+        unknown = set(sections or ()).difference(REPORT_SECTIONS)
+        if unknown:
+            parser.error(f"Unknown report sections: {', '.join(sorted(unknown))}")
+        analyzer = build_analyzer(args, parser)
+        if args.output:
+            print(analyzer.save_report(args.output, sections))
+        else:
+            analyzer.write_report(sys.stdout, sections)
+            sys.stdout.write("\n")
+    
+    elif args.command == "export":
+        from render import FORMATS
+        
+        formats = _split_list(args.format) or []
+        unknown = [output_format for output_format in formats if output_format not in FORMATS]
+        if unknown:
+            parser.error(f"Unknown output formats: {', '.join(unknown)} (expected {', '.join(FORMATS)})")
+        analyzer = build_analyzer(args, parser)
+        results = analyzer.render_outputs(args.output_dir, formats, args.per_symbol, args.force)
+        for path, status in results.items():
+            print(f"{status}: {path}")
     
-    # Save report and data files
-    print(analyzer.save_report())
-    print(analyzer.save_data())
+    # Structured metrics dump when instrumentation is enabled
+    if analyzer.instrumentation.enabled:
+        print(analyzer.instrumentation.dump(os.environ.get(METRICS_FILE_ENV, "crypto_sentiment_metrics.json")))
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
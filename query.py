@@ -0,0 +1,306 @@
+import json
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from main import DailySeries, date_key, date_slice
+
+# Day fields that can be queried as series or ranked across symbols
+QUERY_METRICS = ("positive_sentiment", "mentions", "posts", "likes", "price", "price_change_pct")
+
+# Cache key symbol for results spanning every symbol (dropped on any invalidation)
+ALL_SYMBOLS = "*"
+
+# Recent per-endpoint latencies kept for percentiles
+LATENCY_WINDOW = 10000
+
+
+class LRUCache:
+    """Thread-safe size-bounded LRU cache with a per-entry time-to-live
+
+    Keys are tuples whose first element is a symbol (or ALL_SYMBOLS), so
+    invalidate() can drop every entry for a symbol without scanning.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires, value)
+        self._by_symbol = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None, count=True):
+        """Cached value for key, or default; count=False leaves the hit/miss statistics alone"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[0] is not None and entry[0] < self.clock()):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += count
+                return default
+            self._entries.move_to_end(key)
+            self.hits += count
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            expires = None if self.ttl is None else self.clock() + self.ttl
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            self._by_symbol[key[0]].add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        del self._entries[key]
+        keys = self._by_symbol.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_symbol[key[0]]
+
+    def invalidate(self, symbols=None):
+        """Drop entries for the given symbols and every cross-symbol entry (everything if None)"""
+        with self._lock:
+            if symbols is None:
+                self._entries.clear()
+                self._by_symbol.clear()
+                return
+            for symbol in list(symbols) + [ALL_SYMBOLS]:
+                for key in list(self._by_symbol.get(symbol, ())):
+                    self._remove(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class QueryService:
+    """Per-symbol and per-range lookups over an analyzer's sentiment data
+
+    Answers are cached by (symbol, query, range, parameters) in an LRUCache
+    that the analyzer invalidates per symbol whenever new data arrives
+    (ingest, regeneration, loading). The *_batch methods answer many
+    symbols in one call. Per-query latencies are kept for latency_stats().
+    
+    Queries run concurrently. A miss is computed once however many threads
+    ask for the same key at the same time (the others wait for its result),
+    under the shared side of the analyzer's data_lock; ingestion takes the
+    exclusive side, so a miss never sees half-ingested data, and an answer
+    is stored before the invalidation for the next change can run.
+    """
+
+    def __init__(self, analyzer, cache_size=4096, ttl=300):
+        self.analyzer = analyzer
+        self.cache = LRUCache(cache_size, ttl)
+        self._latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._pending = {}  # key -> threading.Event set when its computation finishes
+        self._pending_lock = threading.Lock()
+        analyzer.add_invalidation_listener(self.cache.invalidate)
+
+    def _cached(self, name, symbol, start, end, params, compute):
+        began = time.perf_counter()
+        key = (symbol, name, date_key(start), date_key(end), params)
+        result = self.cache.get(key)
+        while result is None:
+            with self._pending_lock:
+                pending = self._pending.get(key)
+                computing = pending is None
+                if computing:
+                    pending = self._pending[key] = threading.Event()
+            if computing:
+                try:
+                    with self.analyzer.data_lock.read():
+                        result = compute()
+                        self.cache.put(key, result)
+                finally:
+                    with self._pending_lock:
+                        del self._pending[key]
+                    pending.set()
+            else:
+                # Still None if that computation failed or was invalidated already; try again
+                pending.wait()
+                result = self.cache.get(key, count=False)
+        self._latencies[name].append(time.perf_counter() - began)
+        return result
+
+    def _dates_and_values(self, symbol, metric, start, end):
+        if metric not in QUERY_METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(QUERY_METRICS)}")
+        store = self.analyzer.store
+        if store is not None:
+            days = date_slice(store.date_keys, start, end)
+            row = store.symbol_index[symbol]
+            dates, values = store.date_keys[days], store.columns[metric][row, days].tolist()
+            # Skip days a packed store has no observation for, like missing dict days
+            present = store.present[row, days]
+            if not present.all():
+                kept = present.nonzero()[0].tolist()
+                dates, values = [dates[i] for i in kept], [values[i] for i in kept]
+            return dates, values
+        data = self.analyzer.sentiment_data[symbol]["data"]
+        if isinstance(data, DailySeries):
+            days = date_slice(data.dates, start, end)
+            return data.dates[days], data.column(metric)[days].tolist()
+        dates = sorted(data)
+        dates = dates[date_slice(dates, start, end)]
+        return dates, [data[date_str][metric] for date_str in dates]
+
+    def series(self, symbol, metric="positive_sentiment", start=None, end=None):
+        """{"dates": [...], "values": [...]} of one metric for a symbol over an inclusive date range"""
+        def compute():
+            dates, values = self._dates_and_values(symbol, metric, start, end)
+            return {"symbol": symbol, "metric": metric, "dates": list(dates), "values": values}
+        return self._cached("series", symbol, start, end, metric, compute)
+
+    def correlation(self, symbol, start=None, end=None, x="positive_sentiment", y="price_change_pct"):
+        """Pearson correlation between two metrics of a symbol over a date range"""
+        def compute():
+            _, a = self._dates_and_values(symbol, x, start, end)
+            _, b = self._dates_and_values(symbol, y, start, end)
+            return {"symbol": symbol, "x": x, "y": y, "correlation": self.analyzer.calculate_correlation(a, b)}
+        return self._cached("correlation", symbol, start, end, (x, y), compute)
+
+    def top_words(self, symbol, word_type="positive_words", k=5, start=None, end=None):
+        """Top k words of a symbol over a date range"""
+        if word_type not in ("positive_words", "negative_words"):
+            raise ValueError(f"Unknown word type {word_type!r}, expected 'positive_words' or 'negative_words'")
+        def compute():
+            words = self.analyzer.top_words(symbol, word_type, k, start, end)
+            return {"symbol": symbol, "word_type": word_type, "words": [[word, int(count)] for word, count in words]}
+        return self._cached("top_words", symbol, start, end, (word_type, k), compute)
+
+    def ranking(self, metric="mentions", k=10, start=None, end=None, symbols=None):
+        """Symbols ranked by the total (mean for ratios and prices) of a metric over a date range"""
+        average = metric not in ("mentions", "posts", "likes")
+        def compute():
+            scores = []
+            for symbol in (self.analyzer.sentiment_data if symbols is None else symbols):
+                _, values = self._dates_and_values(symbol, metric, start, end)
+                if values:
+                    total = sum(values)
+                    scores.append((symbol, total / len(values) if average else total))
+            scores.sort(key=lambda item: item[1], reverse=True)
+            return {"metric": metric, "aggregate": "mean" if average else "sum",
+                    "ranking": [[symbol, score] for symbol, score in scores[:k]]}
+        params = (metric, k, None if symbols is None else tuple(symbols))
+        return self._cached("ranking", ALL_SYMBOLS, start, end, params, compute)
+
+    def series_batch(self, symbols, metric="positive_sentiment", start=None, end=None):
+        return {symbol: self.series(symbol, metric, start, end) for symbol in symbols}
+
+    def correlation_batch(self, symbols, start=None, end=None, x="positive_sentiment", y="price_change_pct"):
+        return {symbol: self.correlation(symbol, start, end, x, y) for symbol in symbols}
+
+    def top_words_batch(self, symbols, word_type="positive_words", k=5, start=None, end=None):
+        return {symbol: self.top_words(symbol, word_type, k, start, end) for symbol in symbols}
+
+    def latency_stats(self):
+        """Per-query count, p50, p99 and max latency in milliseconds over the recent window"""
+        stats = {}
+        for name, latencies in list(self._latencies.items()):
+            values = sorted(latencies)
+            stats[name] = {
+                "count": len(values),
+                "p50_ms": _percentile(values, 0.50) * 1000,
+                "p99_ms": _percentile(values, 0.99) * 1000,
+                "max_ms": values[-1] * 1000
+            }
+        return stats
+
+
+class _QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        service = self.server.service
+        url = urllib.parse.urlsplit(self.path)
+        params = {name: values[-1] for name, values in urllib.parse.parse_qs(url.query).items()}
+        symbols = [symbol for symbol in params.pop("symbols", params.pop("symbol", "")).split(",") if symbol]
+        start, end = params.pop("start", None), params.pop("end", None)
+        try:
+            if url.path == "/series":
+                payload = service.series_batch(symbols, params.get("metric", "positive_sentiment"), start, end)
+            elif url.path == "/correlation":
+                payload = service.correlation_batch(
+                    symbols, start, end, params.get("x", "positive_sentiment"), params.get("y", "price_change_pct")
+                )
+            elif url.path == "/top_words":
+                payload = service.top_words_batch(
+                    symbols, params.get("word_type", "positive_words"), int(params.get("k", 5)), start, end
+                )
+            elif url.path == "/ranking":
+                payload = service.ranking(params.get("metric", "mentions"), int(params.get("k", 10)), start, end,
+                                          symbols or None)
+            elif url.path == "/stats":
+                payload = {"cache": service.cache.stats(), "latency": service.latency_stats()}
+            else:
+                return self._send(404, {"error": f"Unknown path {url.path}"})
+        except KeyError as exc:
+            return self._send(404, {"error": f"Unknown symbol {exc.args[0]}"})
+        except ValueError as exc:
+            return self._send(400, {"error": str(exc)})
+        self._send(200, payload)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QueryServer:
+    """Thin local HTTP front end for a QueryService
+
+    GET /series, /correlation and /top_words take symbols=BTC,ETH (batch),
+    start and end; /ranking takes metric and k; /stats reports cache and
+    latency statistics. Responses are JSON. Runs in a background thread;
+    use as a context manager or call start()/stop().
+    """
+
+    def __init__(self, service, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), _QueryHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.service = service
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
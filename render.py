@@ -0,0 +1,208 @@
+import datetime
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Bump when a renderer's output changes for the same input, so unchanged-input skips don't keep stale files
+RENDER_VERSION = 1
+
+FORMATS = ("text", "html", "json")
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# Series charted in the dashboard's trend chart, when present (the text report's trend symbols)
+TREND_SYMBOLS = ("BTC", "ETH", "SOL", "DOGE", "XRP")
+
+# Symbols shown in the dashboard's per-symbol charts (the table lists all of them)
+CHART_LIMIT = 30
+
+MANIFEST_FILE = ".render_manifest.json"
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+_template_cache = {}
+_template_lock = threading.Lock()
+
+
+def load_template(path):
+    """Compiled template for a file: alternating literal text and placeholder names
+
+    Cached per path and reloaded only when the file's modification time changes.
+    """
+    mtime = os.path.getmtime(path)
+    with _template_lock:
+        cached = _template_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    with open(path, encoding="utf-8") as f:
+        parts = _PLACEHOLDER.split(f.read())
+    with _template_lock:
+        _template_cache[path] = (mtime, parts)
+    return parts
+
+
+def render_template(parts, values):
+    """Fill a compiled template; odd parts are placeholder names"""
+    return "".join(part if i % 2 == 0 else str(values[part]) for i, part in enumerate(parts))
+
+
+def _compact_float(value, digits=4):
+    return 0.0 if value is None or math.isnan(value) else round(value, digits)
+
+
+def _json_safe(value):
+    """Copy of a JSON-ready structure with NaN and infinities replaced by None (JSON has no NaN)"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+def _fingerprint(*items):
+    digest = hashlib.sha256()
+    for item in items:
+        digest.update(json.dumps(item, sort_keys=True, separators=(",", ":"), default=list).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ReportRenderer:
+    """Render the text report, an HTML/Chart.js dashboard and a JSON summary from one aggregate pass
+
+    The per-symbol summaries are computed once (see
+    CryptoSentimentAnalysis.summaries) and every output renders from them
+    on a thread pool. Each output's input fingerprint (its data, renderer
+    version and template) is kept in a manifest in the output directory;
+    outputs whose fingerprint is unchanged are not rewritten unless forced.
+    With per_symbol, one JSON file per symbol is written under symbols/,
+    each fingerprinted on its own, so an update to a few symbols rewrites
+    only their files.
+    """
+
+    def __init__(self, analyzer, output_dir=".", basename="crypto_sentiment_report", workers=None):
+        self.analyzer = analyzer
+        self.output_dir = output_dir
+        self.basename = basename
+        self.workers = workers
+
+    def render(self, formats=FORMATS, per_symbol=False, force=False):
+        """Write the requested outputs; returns {path: "written" | "unchanged"}"""
+        for output_format in formats:
+            if output_format not in FORMATS:
+                raise ValueError(f"Unknown output format {output_format!r}, expected one of {', '.join(FORMATS)}")
+        instrumentation = self.analyzer.instrumentation
+
+        # The one aggregate pass; the text report reads the same memoized summaries
+        with instrumentation.stage("render.aggregate"):
+            summaries = self.analyzer.summaries()
+            dates = [date.strftime("%Y-%m-%d") for date in self.analyzer.dates[:1] + self.analyzer.dates[-1:]]
+            dashboard_data = self._dashboard_data(summaries)
+
+        manifest = self._load_manifest()
+        with instrumentation.stage("render.fingerprint"):
+            data_key = _fingerprint(summaries, dates)
+            jobs = []
+            if "text" in formats:
+                # The methodology note names the data's origin
+                jobs.append((f"{self.basename}.txt", _fingerprint(RENDER_VERSION, "text", data_key, self.analyzer.data_origin),
+                             self._render_text, ()))
+            if "html" in formats:
+                template = os.path.join(TEMPLATE_DIR, "dashboard.html")
+                jobs.append((f"{self.basename}.html", _fingerprint(RENDER_VERSION, "html", os.path.getmtime(template), data_key),
+                             self._render_html, (dashboard_data, dates, template)))
+            if "json" in formats:
+                jobs.append((f"{self.basename}.json", _fingerprint(RENDER_VERSION, "json", data_key),
+                             self._render_json, (summaries, dates)))
+            if per_symbol:
+                for symbol, summary in summaries.items():
+                    jobs.append((os.path.join("symbols", f"{symbol}.json"), _fingerprint(RENDER_VERSION, "symbol", summary),
+                                 self._render_symbol_json, (summary,)))
+
+        results = {}
+        pending = []
+        for name, key, renderer, inputs in jobs:
+            path = os.path.join(self.output_dir, name)
+            if not force and manifest.get(name) == key and os.path.exists(path):
+                results[path] = "unchanged"
+            else:
+                pending.append((name, key, path, renderer, inputs))
+
+        def run(item):
+            name, key, path, renderer, inputs = item
+            content = renderer(*inputs)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            return name, key, path, len(content)
+
+        with instrumentation.stage("render.outputs"):
+            with ThreadPoolExecutor(max_workers=self.workers or min(8, max(1, len(pending)))) as executor:
+                for name, key, path, size in executor.map(run, pending):
+                    manifest[name] = key
+                    results[path] = "written"
+                    instrumentation.count("bytes_written", size)
+        instrumentation.count("outputs_written", len(pending))
+        instrumentation.count("outputs_unchanged", len(jobs) - len(pending))
+
+        self._save_manifest(manifest)
+        return results
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST_FILE)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    def _dashboard_data(self, summaries):
+        """Columnar, rounded aggregates for the dashboard: one array per field"""
+        rows = list(summaries.values())
+        present = [symbol for symbol in TREND_SYMBOLS if symbol in summaries]
+        if not present:
+            present = [row["symbol"] for row in sorted(rows, key=lambda row: row["avg_daily_mentions"], reverse=True)[:5]]
+        return {
+            "symbol": [row["symbol"] for row in rows],
+            "name": [row["name"] for row in rows],
+            "trend": [row["trend"] for row in rows],
+            "sentiment_mean": [_compact_float(row["sentiment_mean"]) for row in rows],
+            "correlation": [_compact_float(row["correlation"]) for row in rows],
+            "avg_daily_mentions": [round(row["avg_daily_mentions"]) for row in rows],
+            "last_dates": rows[0]["last_dates"] if rows else [],
+            "last_sentiment": [[_compact_float(value) for value in row["last_sentiment"]] for row in rows],
+            "trend_symbols": present,
+            "chart_limit": CHART_LIMIT
+        }
+
+    def _render_text(self):
+        return "\n".join(self.analyzer.iter_report())
+
+    def _render_html(self, dashboard_data, dates, template):
+        data = json.dumps(dashboard_data, separators=(",", ":")).replace("</", "<\\/")
+        return render_template(load_template(template), {
+            "title": "Crypto Sentiment Analysis Dashboard",
+            "generated": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "start": dates[0] if dates else "",
+            "end": dates[-1] if dates else "",
+            "data": data
+        })
+
+    def _render_json(self, summaries, dates):
+        return json.dumps({
+            "generated": datetime.datetime.now().isoformat(timespec="seconds"),
+            "start": dates[0] if dates else None,
+            "end": dates[-1] if dates else None,
+            "symbols": _json_safe(summaries)
+        }, separators=(",", ":"), default=list, allow_nan=False)
+
+    def _render_symbol_json(self, summary):
+        return json.dumps(_json_safe(summary), separators=(",", ":"), default=list, allow_nan=False)
@@ -0,0 +1,366 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from abc import ABC, abstractmethod
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Path of the bulk sentiment endpoint: ?symbols=BTC,ETH&start=YYYY-MM-DD&end=YYYY-MM-DD
+SENTIMENT_PATH = "/v1/sentiment"
+
+# HTTP statuses worth retrying (rate limiting and transient server errors)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class DataSource(ABC):
+    """Where CryptoSentimentAnalysis.load_source() gets its observations from
+
+    fetch() returns {symbol: {"name", "trend", "data": {date_str: day record}}}
+    for the requested symbols and inclusive date range, in the same layout as
+    sentiment_data (and save_data's JSON). Symbols the source does not know
+    are left out; day records need at least positive_sentiment, mentions and
+    price_change_pct.
+    """
+
+    @abstractmethod
+    def fetch(self, symbols, start, end):
+        """{symbol: entry} for the symbols and inclusive date range (YYYY-MM-DD strings)"""
+
+    def describe(self):
+        """Where the data comes from, for the report's methodology note"""
+        return f"a {type(self).__name__}"
+
+
+class JsonFileSource(DataSource):
+    """Offline source reading a file written by save_data()"""
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def fetch(self, symbols, start, end):
+        with open(self.filename) as f:
+            return select_fixtures(json.load(f), symbols, start, end)
+
+    def describe(self):
+        return f"the recorded data file {self.filename}"
+
+
+def select_fixtures(fixtures, symbols, start, end):
+    """Subset of recorded sentiment data for the given symbols and inclusive date range"""
+    selected = {}
+    for symbol in symbols:
+        entry = fixtures.get(symbol)
+        if entry is None:
+            continue
+        selected[symbol] = {
+            "name": entry.get("name", symbol),
+            "trend": entry.get("trend", "stable"),
+            "data": {date_str: day for date_str, day in entry["data"].items() if start <= date_str <= end}
+        }
+    return selected
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, at most `size` in use at a time"""
+
+    def __init__(self, host, port, size, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def get(self, path):
+        """Send one GET and return (status, headers, body)"""
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                connection = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+                self.opened += 1
+            try:
+                status, headers, body = await asyncio.wait_for(self._round_trip(connection, path), self.timeout)
+            except BaseException:
+                connection[1].close()
+                raise
+            if headers.get("connection", "").lower() == "close":
+                connection[1].close()
+            else:
+                self._idle.append(connection)
+            return status, headers, body
+
+    async def _round_trip(self, connection, path):
+        reader, writer = connection
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Accept: application/json\r\nConnection: keep-alive\r\n\r\n".encode("ascii")
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed before a response was received")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            headers["connection"] = "close"
+        return status, headers, body
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+class HttpSentimentSource(DataSource):
+    """Bulk fetcher for an HTTP sentiment provider exposing SENTIMENT_PATH
+
+    Symbols are requested batch_size at a time for the whole date range,
+    with up to `concurrency` requests in flight over a pool of keep-alive
+    connections. Failed requests (connection errors, timeouts and
+    RETRY_STATUSES) are retried with exponential backoff and jitter,
+    honouring Retry-After. With cache_dir set, successful responses are
+    stored on disk and reused for cache_ttl seconds (forever if None).
+    """
+
+    def __init__(self, base_url, concurrency=16, batch_size=50, retries=3, backoff=0.25,
+                 timeout=10.0, cache_dir=None, cache_ttl=None):
+        url = urllib.parse.urlsplit(base_url)
+        if url.scheme != "http":
+            raise ValueError(f"Unsupported URL scheme {url.scheme!r}, expected 'http'")
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip("/")
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.stats = Counter()
+
+    def fetch(self, symbols, start, end):
+        return asyncio.run(self.fetch_async(symbols, start, end))
+
+    def describe(self):
+        return f"the sentiment provider at http://{self.host}:{self.port}{self.prefix}"
+
+    async def fetch_async(self, symbols, start, end):
+        symbols = list(symbols)
+        pool = _ConnectionPool(self.host, self.port, self.concurrency, self.timeout)
+        try:
+            batches = [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+            responses = await asyncio.gather(*[
+                self._get_json(pool, self._path(batch, start, end)) for batch in batches
+            ])
+        finally:
+            pool.close()
+            self.stats["connections"] += pool.opened
+
+        fetched = {}
+        for response in responses:
+            fetched.update(response)
+        # Keep the caller's symbol order
+        return {symbol: fetched[symbol] for symbol in symbols if symbol in fetched}
+
+    def _path(self, symbols, start, end):
+        query = urllib.parse.urlencode({"symbols": ",".join(symbols), "start": start, "end": end}, safe=",")
+        return f"{self.prefix}{SENTIMENT_PATH}?{query}"
+
+    async def _get_json(self, pool, path):
+        cached = self._cache_load(path)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            self.stats["requests"] += 1
+            try:
+                status, headers, body = await pool.get(path)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as exc:
+                error = exc
+            else:
+                if status == 200:
+                    self.stats["bytes"] += len(body)
+                    data = json.loads(body)
+                    self._cache_store(path, body)
+                    return data
+                error = ConnectionError(f"GET {path} returned HTTP {status}")
+                if status not in RETRY_STATUSES:
+                    raise error
+                retry_after = headers.get("retry-after")
+
+            if attempt < self.retries:
+                self.stats["retries"] += 1
+                delay = self.backoff * 2 ** attempt * (0.5 + random.random() / 2)
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                await asyncio.sleep(delay)
+        raise ConnectionError(f"GET {path} failed after {self.retries + 1} attempts: {error}") from error
+
+    def _cache_file(self, path):
+        key = hashlib.sha256(f"{self.host}:{self.port}{path}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _cache_load(self, path):
+        if self.cache_dir is None:
+            return None
+        filename = self._cache_file(path)
+        try:
+            if self.cache_ttl is not None and time.time() - os.path.getmtime(filename) > self.cache_ttl:
+                return None
+            with open(filename, "rb") as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _cache_store(self, path, body):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        filename = self._cache_file(path)
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(body)
+        os.replace(temporary, filename)
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        url = urllib.parse.urlsplit(self.path)
+        if server.latency:
+            time.sleep(server.latency)
+
+        with server.lock:
+            server.request_count += 1
+            failing = server.fail_every and server.request_count % server.fail_every == 0
+        if url.path != SENTIMENT_PATH:
+            return self._send(404, {"error": f"Unknown path {url.path}"})
+        if failing:
+            return self._send(503, {"error": "Injected failure"}, {"Retry-After": "0"})
+
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            symbols = [symbol for symbol in query["symbols"][0].split(",") if symbol]
+            start, end = query["start"][0], query["end"][0]
+        except KeyError as exc:
+            return self._send(400, {"error": f"Missing query parameter {exc.args[0]}"})
+        self._send(200, select_fixtures(server.fixtures, symbols, start, end))
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Local stand-in for a sentiment provider, serving recorded data over HTTP
+
+    fixtures is sentiment data as written by save_data() (or its filename).
+    latency adds a per-request delay like a remote service would; with
+    fail_every=n every nth request gets a 503, to exercise retries. Runs in
+    a background thread; use as a context manager or call start()/stop().
+    """
+
+    def __init__(self, fixtures, host="127.0.0.1", port=0, latency=0.0, fail_every=0):
+        if isinstance(fixtures, str):
+            with open(fixtures) as f:
+                fixtures = json.load(f)
+        self.httpd = ThreadingHTTPServer((host, port), _FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.fixtures = fixtures
+        self.httpd.latency = latency
+        self.httpd.fail_every = fail_every
+        self.httpd.request_count = 0
+        self.httpd.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recorded sentiment data as a local stand-in provider")
+    parser.add_argument("fixtures", help="JSON file written by CryptoSentimentAnalysis.save_data()")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every nth request with a 503")
+    args = parser.parse_args(argv)
+
+    server = FixtureServer(args.fixtures, args.host, args.port, args.latency, args.fail_every)
+    print(f"Serving {args.fixtures} at {server.url}{SENTIMENT_PATH}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
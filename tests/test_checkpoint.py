@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import main
+
+SETTINGS = {"seed": 11, "days": 8, "end_date": "2024-05-01"}
+
+
+def _dump(analyzer):
+    return json.dumps(analyzer.sentiment_data, sort_keys=True, default=main._json_default)
+
+
+@pytest.mark.parametrize("backend", ["dict", "columnar"])
+def test_resumed_generation_matches_an_uninterrupted_run(tmp_path, backend):
+    cryptocurrencies = main.synthetic_cryptocurrencies(12)
+    checkpoint = str(tmp_path / "run.checkpoint")
+    expected = main.CryptoSentimentAnalysis(backend=backend, cryptocurrencies=cryptocurrencies, **SETTINGS)
+
+    interrupted = main.CryptoSentimentAnalysis(
+        backend=backend, cryptocurrencies=cryptocurrencies, generator=None, **SETTINGS
+    )
+    simulate = interrupted._simulate_symbol
+
+    def simulate_until_interrupted(row, crypto, rng):
+        if row == 7:
+            raise KeyboardInterrupt
+        return simulate(row, crypto, rng)
+
+    interrupted._simulate_symbol = simulate_until_interrupted
+    with pytest.raises(KeyboardInterrupt):
+        interrupted.generate_data(checkpoint, checkpoint_every=3)
+
+    # A write torn by the interruption is dropped on resume
+    with open(checkpoint, "a") as f:
+        f.write('{"symbol": "SYN00007", "days": {"positive_sen')
+
+    resumed = main.CryptoSentimentAnalysis(
+        backend=backend, cryptocurrencies=cryptocurrencies, generator=None, instrumentation=True, **SETTINGS
+    )
+    resumed.generate_data(checkpoint, checkpoint_every=3)
+
+    assert resumed.instrumentation.counters["symbols_resumed"] == 7
+    assert _dump(resumed) == _dump(expected)
+    assert not (tmp_path / "run.checkpoint").exists()
+
+
+def test_checkpoint_from_other_settings_is_rejected(tmp_path):
+    checkpoint = str(tmp_path / "run.checkpoint")
+    main.GenerationCheckpoint(checkpoint, {"seed": 1}).flush()
+    with pytest.raises(ValueError):
+        main.GenerationCheckpoint(checkpoint, {"seed": 2})
+
+
+def test_batch_generator_records_a_reproducible_seed():
+    first = main.CryptoSentimentAnalysis(backend="columnar", generator="batch", days=5, end_date="2024-05-01")
+    assert first.seed is not None
+
+    again = main.CryptoSentimentAnalysis(
+        backend="columnar", generator="batch", days=5, end_date="2024-05-01", seed=first.seed
+    )
+    assert _dump(again) == _dump(first)
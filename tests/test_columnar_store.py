@@ -0,0 +1,45 @@
+import json
+import math
+
+import pytest
+
+import main
+
+
+def test_packed_store_skips_missing_days():
+    analyzer = main.CryptoSentimentAnalysis(seed=2, days=10, end_date="2024-03-01")
+    analyzer.ingest("NEW", "2024-02-25", {"positive_sentiment": 0.7, "mentions": 100, "price": 2.02,
+                                          "price_change_pct": 1.0})
+    store = main.ColumnarSentimentStore.from_sentiment_data(
+        analyzer.sentiment_data, analyzer.positive_words, analyzer.negative_words, {"BTC": 123.0}
+    )
+    assert store.start_prices[store.symbol_index["BTC"]] == 123.0
+    assert math.isclose(store.start_prices[store.symbol_index["NEW"]], 2.0)
+
+    packed = main.CryptoSentimentAnalysis(backend="columnar", generator=None)
+    packed.store, packed.sentiment_data = store, main.ColumnarSentimentView(store)
+    summary = packed.symbol_summary("NEW")
+    assert summary["days"] == 1
+    assert (summary["sentiment_mean"], summary["sentiment_std"]) == (0.7, 0.0)
+    assert summary["last_dates"] == ["2024-02-25"] and summary["last_sentiment"] == [0.7]
+
+
+def test_sparse_snapshot_round_trip(tmp_path):
+    analyzer = main.CryptoSentimentAnalysis(seed=3, days=5, end_date="2024-03-05")
+    analyzer.ingest("NEW", "2024-03-05", {"positive_sentiment": 0.6, "mentions": 10, "price": 2.0,
+                                          "price_change_pct": 1.0})
+    analyzer.save_data(str(tmp_path / "sparse.snapshot"), "snapshot")
+
+    loaded = main.CryptoSentimentAnalysis.from_snapshot(str(tmp_path / "sparse.snapshot"))
+    days = loaded.sentiment_data["NEW"]["data"]
+    assert len(days) == 1 and list(days) == ["2024-03-05"]
+    assert "2024-03-04" not in days and "2024-03-05" in days
+    assert len(loaded.sentiment_data["BTC"]["data"]) == 6
+    assert loaded.symbol_summary("NEW")["total_mentions"] == 10
+
+    # Strict JSON: no NaN stand-ins for the missing days
+    loaded.save_data(str(tmp_path / "sparse.json"))
+    with open(tmp_path / "sparse.json") as f:
+        saved = json.load(f, parse_constant=lambda constant: pytest.fail(f"{constant} in JSON"))
+    assert list(saved["NEW"]["data"]) == ["2024-03-05"]
+    assert saved["BTC"]["data"] == json.loads(json.dumps(dict(analyzer.sentiment_data["BTC"]["data"])))
@@ -0,0 +1,32 @@
+import main
+
+
+def _day(positive, mentions, **extra):
+    record = {"positive_sentiment": positive, "mentions": mentions, "price_change_pct": 0.5}
+    record.update(extra)
+    return record
+
+
+def test_ingest_accepts_float_counts():
+    analyzer = main.CryptoSentimentAnalysis(seed=1, days=5, window_days=3)
+    analyzer.ingest("BTC", "2030-01-01", _day(0.6, 12000.0, posts=300.0, likes=900.0,
+                                              positive_words={"gain": 2.0}))
+
+    day = analyzer.sentiment_data["BTC"]["data"]["2030-01-01"]
+    assert (day["mentions"], day["posts"], day["likes"]) == (12000, 300, 900)
+    assert day["positive_words"] == {"gain": 2}
+
+
+def test_window_eviction_keeps_latest_days():
+    series = main.DailySeries({word_type: main.Vocabulary([]) for word_type in main.DailySeries.WORD_FIELDS})
+    for i in range(300):
+        series[f"2030-01-01+{i:03d}"] = dict(_day(0.5, i), negative_sentiment=0.5, posts=0, likes=0, price=1.0,
+                                            positive_words={f"w{i % 7}": i}, negative_words={})
+        if len(series) > 30:
+            del series[series.dates[0]]
+
+    assert len(series) == 30
+    assert series.dates[0] == "2030-01-01+270"
+    assert list(series.column("mentions")) == list(range(270, 300))
+    assert series.words(0, "positive_words") == {"w4": 270}
+    assert sum(series.word_totals("positive_words").values()) == sum(range(270, 300))
@@ -0,0 +1,55 @@
+import json
+import math
+import os
+import statistics
+
+from history import INDEX_FILE, HistoryStore
+
+
+def _day(price, mentions, words):
+    return {"price": price, "mentions": mentions, "positive_words": words}
+
+
+def test_single_appends_write_the_index_on_flush(tmp_path):
+    directory = str(tmp_path)
+    with HistoryStore(directory) as store:
+        store.append("BTC", "2024-01-01", _day(100.0, 10, {"gain": 2}), name="Bitcoin")
+        store.append("BTC", "2024-01-02", _day(101.0, 20, {"gain": 1, "rally": 4}))
+        assert not os.path.exists(os.path.join(directory, INDEX_FILE))
+        # Unflushed appends are visible to queries on the same store
+        assert store.aggregate("mentions")["sum"] == 30
+        assert store.top_words(k=1) == [("rally", 4)]
+
+    reopened = HistoryStore(directory)
+    assert reopened.symbols["BTC"]["name"] == "Bitcoin"
+    assert reopened.aggregate("mentions")["sum"] == 30
+    assert reopened.top_words(k=2) == [("rally", 4), ("gain", 3)]
+
+
+def test_std_keeps_precision_for_large_values_and_replacements(tmp_path):
+    prices = [1e9 + offset for offset in (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)]
+    observations = [("BTC", f"2024-{1 + i // 5:02d}-{1 + i % 5:02d}", _day(price, 1, {}))
+                    for i, price in enumerate(prices)]
+    store = HistoryStore(str(tmp_path))
+    store.append_many(observations)
+    store.append_many([("BTC", "2024-02-05", _day(1e9 + 1.0, 1, {}))])  # supersedes a day
+    assert math.isclose(store.aggregate("price")["std"], statistics.pstdev(prices), rel_tol=1e-6)
+    assert math.isclose(store.aggregate("price", start="2024-01-02", end="2024-02-03")["std"],
+                        statistics.pstdev(prices[1:8]), rel_tol=1e-6)
+
+
+def test_old_index_statistics_are_rebuilt(tmp_path):
+    directory = str(tmp_path)
+    HistoryStore(directory).append_many([("ETH", f"2024-03-0{day}", _day(3000.0 + day, day, {}))
+                                         for day in range(1, 6)])
+    filename = os.path.join(directory, INDEX_FILE)
+    with open(filename) as f:
+        index = json.load(f)
+    del index["version"]
+    with open(filename, "w") as f:
+        json.dump(index, f)
+
+    store = HistoryStore(directory)
+    assert math.isclose(store.aggregate("price")["std"], statistics.pstdev([3001.0, 3002.0, 3003.0, 3004.0, 3005.0]))
+    with open(filename) as f:
+        assert json.load(f)["version"] == 2
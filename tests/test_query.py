@@ -0,0 +1,53 @@
+import threading
+import time
+
+import main
+import query
+
+
+def test_concurrent_misses_compute_once_without_blocking_other_symbols():
+    analyzer = main.CryptoSentimentAnalysis(seed=6, days=10, end_date="2024-01-10")
+    service = query.QueryService(analyzer, ttl=None)
+    calls = []
+    release = threading.Event()
+    top_words = analyzer.top_words
+
+    def slow_top_words(symbol, *args):
+        calls.append(symbol)
+        release.wait(5)
+        return top_words(symbol, *args)
+
+    analyzer.top_words = slow_top_words
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.top_words("BTC"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while not calls:
+        time.sleep(0.001)
+
+    # A slow miss for one symbol does not hold up misses for others
+    began = time.perf_counter()
+    assert service.series("ETH")["dates"]
+    assert time.perf_counter() - began < 1
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == ["BTC"]
+    assert len(results) == 4 and all(result == results[0] for result in results)
+
+
+def test_ingest_waits_for_running_queries_and_invalidates_after_them():
+    analyzer = main.CryptoSentimentAnalysis(seed=6, days=10, end_date="2024-01-10")
+    service = query.QueryService(analyzer, ttl=None)
+    before = service.series("BTC")["values"]
+
+    with analyzer.data_lock.read():
+        ingest = threading.Thread(target=analyzer.ingest, args=(
+            "BTC", "2024-01-11", {"positive_sentiment": 0.5, "mentions": 10, "price_change_pct": 0.0}))
+        ingest.start()
+        ingest.join(0.05)
+        assert ingest.is_alive()
+    ingest.join()
+
+    assert service.series("BTC")["values"] == before + [0.5]
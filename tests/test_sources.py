@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import main
+import sources
+
+
+@pytest.fixture(scope="module")
+def fixtures(tmp_path_factory):
+    analyzer = main.CryptoSentimentAnalysis(seed=7, days=9, end_date="2024-02-10")
+    filename = str(tmp_path_factory.mktemp("fixtures") / "data.json")
+    analyzer.save_data(filename)
+    with open(filename) as f:
+        return json.load(f)
+
+
+def test_injected_503s_are_retried(fixtures):
+    with sources.FixtureServer(fixtures, fail_every=2) as server:
+        source = sources.HttpSentimentSource(server.url, concurrency=1, batch_size=2, backoff=0.001)
+        fetched = source.fetch(["BTC", "ETH", "SOL", "DOGE"], "2024-02-01", "2024-02-10")
+
+    assert list(fetched) == ["BTC", "ETH", "SOL", "DOGE"]
+    assert fetched["BTC"]["data"] == sources.select_fixtures(fixtures, ["BTC"], "2024-02-01", "2024-02-10")["BTC"]["data"]
+    assert source.stats["retries"] >= 1
+    assert source.stats["requests"] == server.request_count == 2 + source.stats["retries"]
+
+
+def test_cached_responses_skip_the_server(fixtures, tmp_path):
+    with sources.FixtureServer(fixtures) as server:
+        source = sources.HttpSentimentSource(server.url, batch_size=1, cache_dir=str(tmp_path))
+        first = source.fetch(["BTC", "ETH"], "2024-02-01", "2024-02-10")
+        second = source.fetch(["BTC", "ETH"], "2024-02-01", "2024-02-10")
+        requests = server.request_count
+
+    assert first == second
+    assert requests == 2
+    assert source.stats["cache_hits"] == 2
+
+
+def test_symbol_order_is_kept_across_concurrent_batches(fixtures):
+    symbols = ["AVAX", "NOPE", "BTC", "DOGE", "USDT", "ETH", "XRP"]
+    with sources.FixtureServer(fixtures, latency=0.01) as server:
+        fetched = sources.HttpSentimentSource(server.url, concurrency=4, batch_size=1).fetch(
+            symbols, "2024-02-01", "2024-02-10"
+        )
+
+    assert list(fetched) == [symbol for symbol in symbols if symbol != "NOPE"]
+
+
+def test_loaded_data_gets_the_simulated_aggregates_and_its_origin(fixtures, tmp_path):
+    filename = str(tmp_path / "data.json")
+    with open(filename, "w") as f:
+        json.dump(fixtures, f)
+    analyzer = main.CryptoSentimentAnalysis(generator=None)
+    analyzer.load_source(sources.JsonFileSource(filename), start="2024-02-01", end="2024-02-10")
+
+    for symbol, entry in analyzer.sentiment_data.items():
+        for key in ("sentiment_price_correlation", "avg_daily_mentions"):
+            assert entry[key] == pytest.approx(fixtures[symbol][key])
+        assert [list(pair) for pair in entry["top_positive_words"]] == fixtures[symbol]["top_positive_words"]
+    methodology = " ".join(analyzer.iter_report(["methodology"]))
+    assert filename in methodology and "simulated" not in methodology
@@ -0,0 +1,33 @@
+import math
+
+import main
+
+
+def _day(positive, mentions, change, words):
+    return {"positive_sentiment": positive, "mentions": mentions, "price_change_pct": change,
+            "positive_words": words}
+
+
+def test_replaced_and_evicted_days_match_a_recount():
+    analyzer = main.CryptoSentimentAnalysis(seed=4, days=6, window_days=4, end_date="2024-01-06")
+    analyzer.ingest("BTC", "2024-01-07", _day(0.6, 100, 1.5, {"gain": 3}))
+    analyzer.ingest("BTC", "2024-01-06", _day(0.4, 200, -0.5, {"gain": 1, "rally": 2}))  # replaces a day
+    analyzer.ingest("BTC", "2024-01-09", _day(0.7, 300, 2.0, {"rally": 5}))  # evicts two days
+
+    entry = analyzer.sentiment_data["BTC"]
+    series = entry["data"]
+    assert series.dates == ["2024-01-06", "2024-01-07", "2024-01-09"]
+    assert set(analyzer.streams["BTC"].days.values()) == set(series.dates)
+    assert math.isclose(entry["sentiment_price_correlation"], analyzer.calculate_correlation(
+        series.column("positive_sentiment"), series.column("price_change_pct")))
+    assert entry["avg_daily_mentions"] == sum(series.column("mentions")) / len(series)
+    assert entry["top_positive_words"] == series.word_totals("positive_words").most_common(5)
+
+
+def test_top_words_are_ranked_when_read():
+    analyzer = main.CryptoSentimentAnalysis(seed=4, days=6, end_date="2024-01-06")
+    analyzer.ingest("BTC", "2024-01-07", _day(0.6, 100, 1.5, {"gain": 3}))
+    entry = analyzer.sentiment_data["BTC"]
+    assert "top_positive_words" not in entry
+    assert entry["top_positive_words"] == entry["data"].word_totals("positive_words").most_common(5)
+    assert entry.get("top_negative_words") == entry["data"].word_totals("negative_words").most_common(5)